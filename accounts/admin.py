@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
 from .models import CustomUser, UserLodge, Brother
@@ -8,6 +9,10 @@ from .models import CustomUser, UserLodge, Brother
 class UserLodgeInline(admin.TabularInline):
     model = UserLodge
     extra = 1
+    autocomplete_fields = ('lodge',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'lodge')
 
 
 @admin.register(CustomUser)
@@ -16,6 +21,7 @@ class CustomUserAdmin(UserAdmin):
     list_filter = ('is_staff', 'is_superuser', 'groups', 'profession')
     search_fields = ('username', 'first_name', 'last_name', 'email', 'phone_number', 'profession__name')
     ordering = ('username',)
+    list_select_related = ('profession',)
     inlines = [UserLodgeInline]
 
     fieldsets = (
@@ -61,7 +67,14 @@ class BrotherAdmin(admin.ModelAdmin):
         return False
 
     def get_queryset(self, request):
-        return super().get_queryset(request).filter(is_superuser=False)
+        return (
+            super().get_queryset(request)
+            .filter(is_superuser=False)
+            .select_related('profession')
+            .prefetch_related(
+                Prefetch('userlodge_set', queryset=UserLodge.objects.select_related('lodge'))
+            )
+        )
     
     def get_full_name(self, obj):
         return obj.get_full_name() or obj.username
@@ -69,6 +82,6 @@ class BrotherAdmin(admin.ModelAdmin):
     get_full_name.admin_order_field = 'first_name'
     
     def get_lodges(self, obj):
-        lodges = obj.userlodge_set.all().values_list('lodge__name', flat=True)
+        lodges = [user_lodge.lodge.name for user_lodge in obj.userlodge_set.all()]
         return ', '.join(lodges) if lodges else '-'
     get_lodges.short_description = _('Lojas')
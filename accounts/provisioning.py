@@ -0,0 +1,104 @@
+"""
+Bulk account creation.
+
+Hashing a password with the default PBKDF2 hasher costs about 100ms of pure
+CPU, so ``hash_passwords`` spreads the work over a process pool and
+``create_users`` writes the rows with ``bulk_create``. Small batches are
+hashed in-process: starting the pool costs more than it saves.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+
+from .models import CustomUser, UserLodge
+
+BULK_BATCH_SIZE = 500
+
+
+def hash_passwords(passwords, workers=None, threshold=None):
+    """
+    Hash raw passwords, across a pool of processes for large batches.
+
+    The default hasher and the salts come from the caller; workers only run
+    ``hasher.encode``. They are spawned, not forked, so they share no
+    database connection or thread with the caller, and they never load the
+    Django settings.
+
+    Args:
+        passwords (list): Raw passwords
+        workers (int): Pool size. Defaults to ``settings.PROVISIONING_WORKERS``
+            or the number of CPUs; 1 hashes in-process
+        threshold (int): Smallest batch sent to the pool. Defaults to
+            ``settings.PROVISIONING_PARALLEL_THRESHOLD``
+
+    Returns:
+        list: Encoded passwords, in the same order
+    """
+    hasher = get_hasher('default')
+    salts = [hasher.salt() for _ in passwords]
+
+    workers = workers or settings.PROVISIONING_WORKERS or os.cpu_count() or 1
+    if threshold is None:
+        threshold = settings.PROVISIONING_PARALLEL_THRESHOLD
+    if workers == 1 or len(passwords) < max(threshold, 2):
+        return list(map(hasher.encode, passwords, salts))
+
+    workers = min(workers, len(passwords))
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(hasher.encode, passwords, salts, chunksize=chunksize))
+
+
+def create_users(users, passwords, workers=None, threshold=None):
+    """
+    Hash the passwords and insert the users with ``bulk_create``.
+
+    Usernames and emails are normalized like ``create_user`` does;
+    ``post_save`` is not sent for these rows.
+
+    Args:
+        users (list): Unsaved CustomUser instances
+        passwords (list): Raw password of each user, in the same order
+        workers (int): Passed to ``hash_passwords``
+        threshold (int): Passed to ``hash_passwords``
+
+    Returns:
+        list: The saved users, with their primary keys set
+    """
+    for user, encoded in zip(users, hash_passwords(passwords, workers, threshold)):
+        user.username = CustomUser.normalize_username(user.username)
+        user.email = CustomUser.objects.normalize_email(user.email)
+        user.password = encoded
+
+    users = CustomUser.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+
+    # Backends that cannot return ids from a bulk insert leave pk unset.
+    if users and users[0].pk is None:
+        ids = dict(
+            CustomUser.objects
+            .filter(username__in=[user.username for user in users])
+            .values_list('username', 'pk')
+        )
+        for user in users:
+            user.pk = ids[user.username]
+    return users
+
+
+def link_lodges(memberships):
+    """
+    Insert the ``UserLodge`` rows for (user, lodge) pairs in bulk.
+
+    Args:
+        memberships (list): (CustomUser, Lodge) tuples
+
+    Returns:
+        list: The created UserLodge rows
+    """
+    return UserLodge.objects.bulk_create(
+        [UserLodge(user=user, lodge=lodge) for user, lodge in memberships],
+        batch_size=BULK_BATCH_SIZE
+    )
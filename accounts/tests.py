@@ -0,0 +1,88 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from lodge.models import Lodge
+from setup.models import Profession
+from .models import CustomUser, UserLodge
+from .provisioning import create_users, hash_passwords, link_lodges
+
+
+class BrotherAdminTests(TestCase):
+    url = '/admin/accounts/brother/'
+
+    def setUp(self):
+        admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        self.client.force_login(admin_user)
+        self.lodges = [
+            Lodge.objects.create(name=f'Loja {number}', city='NITEROI', number=str(number))
+            for number in range(3)
+        ]
+        self.profession = Profession.objects.create(name='ENGENHEIRO')
+        self.created = 0
+
+    def _create_brothers(self, count):
+        for _ in range(count):
+            self.created += 1
+            brother = CustomUser.objects.create_user(
+                username=f'irmao{self.created}',
+                first_name=f'Irmão {self.created}',
+                profession=self.profession
+            )
+            for lodge in self.lodges[:2]:
+                UserLodge.objects.create(user=brother, lodge=lodge)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self._create_brothers(2)
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'LOJA 0, LOJA 1')
+
+        self._create_brothers(48)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Irmão 50')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisioningTests(TestCase):
+    def test_small_batches_are_hashed_in_process(self):
+        with mock.patch('accounts.provisioning.ProcessPoolExecutor') as executor:
+            encoded = hash_passwords(['um', 'dois'], workers=4, threshold=16)
+
+        executor.assert_not_called()
+        self.assertTrue(check_password('dois', encoded[1]))
+
+    def test_pool_uses_callers_hasher_and_keeps_order(self):
+        passwords = [f'senha-{number}' for number in range(6)]
+        encoded = hash_passwords(passwords, workers=2, threshold=0)
+
+        self.assertTrue(all(value.startswith('md5$') for value in encoded))
+        self.assertTrue(all(map(check_password, passwords, encoded)))
+
+    def test_create_users_inserts_in_bulk(self):
+        lodge = Lodge.objects.create(name='Loja Teste', city='NITEROI', number='10')
+        users = [CustomUser(username=f'irmao{number}@EXAMPLE.com', email=f'irmao{number}@EXAMPLE.com') for number in range(3)]
+
+        with CaptureQueriesContext(connection) as queries:
+            users = create_users(users, ['a', 'b', 'c'])
+            link_lodges([(user, lodge) for user in users])
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(users[0].email, 'irmao0@example.com')
+        self.assertTrue(CustomUser.objects.get(pk=users[2].pk).check_password('c'))
+        self.assertEqual(UserLodge.objects.filter(lodge=lodge).count(), 3)
+
+    def test_benchmark_command_compares_serial_and_parallel(self):
+        out = StringIO()
+        call_command('benchmark_provisioning', sizes='2', workers=2, stdout=out)
+
+        self.assertIn('speedup', out.getvalue())
+        self.assertFalse(CustomUser.objects.filter(username__startswith='benchmark-').exists())
@@ -1,6 +1,10 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
 
-from .models import StoreRequest, CancelEventRequest, UserRequest
+from lodge.matching import get_lodge_index
+from .approval import approve_user_requests
+from .models import StoreRequest, CancelEventRequest, UserRequest, OutgoingEmail
 
 
 @admin.register(StoreRequest)
@@ -8,6 +12,8 @@ class StoreRequestAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'number', 'user', 'approved')
     list_filter = ('approved', 'city',)
     search_fields = ('name', 'user__username', 'city', 'number')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -75,6 +81,8 @@ class CancelEventRequestAdmin(admin.ModelAdmin):
     list_display = ('event', 'user', 'reviewed')
     list_filter = ('reviewed',)
     search_fields = ('event__title', 'user__username')
+    list_select_related = ('event', 'user')
+    autocomplete_fields = ('event', 'user')
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -101,10 +109,20 @@ class CancelEventRequestAdmin(admin.ModelAdmin):
         return request.user.is_superuser
 
 
+def _describe_match(match):
+    number = f' Nº {match.number}' if match.number else ''
+    reason = 'número' if match.by_number else f'{match.score:.0%}'
+    return f'{match.name}{number} ({reason})'
+
+
 @admin.register(UserRequest)
 class UserRequestAdmin(admin.ModelAdmin):
-    list_display = ('name', 'surname', 'email', 'phone', 'profession', 'lodge_name', 'lodge_number', 'approved', 'created_at')
+    list_display = (
+        'name', 'surname', 'email', 'phone', 'profession', 'lodge_name', 'lodge_number', 'suggested_lodge',
+        'approved', 'created_at'
+    )
     list_filter = ('approved', 'profession', 'created_at')
+    list_select_related = ('profession',)
     search_fields = (
         'name',
         'surname',
@@ -122,6 +140,7 @@ class UserRequestAdmin(admin.ModelAdmin):
         'profession',
         'lodge_name',
         'lodge_number',
+        'lodge_suggestions',
         'message',
         'created_at',
         'updated_at'
@@ -132,7 +151,7 @@ class UserRequestAdmin(admin.ModelAdmin):
             'fields': ('name', 'surname', 'email', 'phone', 'profession')
         }),
         ('Informações da Loja', {
-            'fields': ('lodge_name', 'lodge_number')
+            'fields': ('lodge_name', 'lodge_number', 'lodge_suggestions')
         }),
         ('Mensagem', {
             'fields': ('message',),
@@ -146,13 +165,63 @@ class UserRequestAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+    actions = ('approve_selected',)
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
 
+    @admin.action(description='Aprovar solicitações selecionadas', permissions=['change'])
+    def approve_selected(self, request, queryset):
+        result = approve_user_requests(queryset)
+        self.message_user(request, f"{result['approved']} solicitação(ões) aprovada(s).", messages.SUCCESS)
+        if result['existing_users']:
+            self.message_user(
+                request,
+                f"Já existe usuário para: {', '.join(result['existing_users'])}. Solicitações mantidas pendentes.",
+                messages.WARNING
+            )
+        if result['lodges_not_found']:
+            self.message_user(
+                request,
+                f"Loja não encontrada para os números: {', '.join(sorted(set(result['lodges_not_found'])))}. "
+                "Usuários criados sem loja.",
+                messages.WARNING
+            )
+        if result['lodges_suggested']:
+            self.message_user(
+                request,
+                f"Lojas sugeridas pelo nome, não vinculadas (confira e vincule no usuário): "
+                f"{'; '.join(result['lodges_suggested'])}.",
+                messages.WARNING
+            )
+
+    @admin.display(description='Loja sugerida')
+    def suggested_lodge(self, obj):
+        matches = get_lodge_index().search(obj.lodge_name, obj.lodge_number, limit=1)
+        if not matches:
+            return '-'
+        return _describe_match(matches[0])
+
+    @admin.display(description='Lojas sugeridas')
+    def lodge_suggestions(self, obj):
+        matches = get_lodge_index().search(obj.lodge_name, obj.lodge_number)
+        if not matches:
+            return 'Nenhuma loja parecida encontrada.'
+        return format_html(
+            '<ul>{}</ul>',
+            format_html_join(
+                '',
+                '<li><a href="{}">{}</a></li>',
+                (
+                    (reverse('admin:lodge_lodge_change', args=[match.lodge_id]), _describe_match(match))
+                    for match in matches
+                )
+            )
+        )
+
     def get_readonly_fields(self, request, obj=None):
         if obj and obj.approved:
-            return [f.name for f in self.model._meta.fields]
+            return [f.name for f in self.model._meta.fields] + ['lodge_suggestions']
         return self.readonly_fields
     
     def change_view(self, request, object_id, form_url='', extra_context=None):
@@ -163,3 +232,29 @@ class UserRequestAdmin(admin.ModelAdmin):
             extra_context['show_save_and_continue'] = False
             extra_context['show_save_and_add_another'] = False
         return super().change_view(request, object_id, form_url, extra_context=extra_context)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'template_name', 'render_time_ms', 'created_at', 'sent_at')
+    list_filter = ('status', 'template_name', 'created_at')
+    search_fields = ('subject', 'recipients')
+    exclude = ('body', 'html_body')
+    readonly_fields = (
+        'subject',
+        'from_email',
+        'recipients',
+        'attempts',
+        'last_error',
+        'sent_at',
+        'template_name',
+        'render_time_ms',
+        'created_at',
+        'updated_at'
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
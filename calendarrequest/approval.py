@@ -0,0 +1,142 @@
+"""
+Bulk approval of ``UserRequest`` rows.
+
+The admin action approves hundreds of signups at once. Going through the
+``create_user_on_approval`` signal would hash, insert and look up the lodge
+one request at a time, so this service does each step once for the batch.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from accounts.models import CustomUser
+from accounts.provisioning import create_users, link_lodges
+from lodge.matching import get_lodge_index
+from lodge.models import Lodge
+from lodge.utils import normalize_lodge_number
+from setup.models import get_setup
+
+from .models import UserRequest
+from .utils import send_email_notification
+
+logger = logging.getLogger(__name__)
+
+
+def approve_user_requests(user_requests):
+    """
+    Approve user requests and create their accounts in bulk.
+
+    Lodges are resolved by number with one query. When the number matches
+    no lodge, the closest lodge name (``lodge.matching``) is only reported
+    as a suggestion for the reviewer to link by hand. Users and
+    ``UserLodge`` rows are written with ``bulk_create`` and the approval
+    emails are queued in the same transaction. Requests are marked approved with ``update()``, so the
+    per-request signal does not create the users a second time.
+
+    Requests that are already approved are ignored. Requests whose email
+    already belongs to a user (in any case), or repeats an earlier request
+    of the batch, are left pending.
+
+    Args:
+        user_requests (QuerySet): UserRequest rows to approve
+
+    Returns:
+        dict: ``approved`` count, ``existing_users`` emails left pending,
+            ``lodges_not_found`` numbers approved without a lodge and
+            ``lodges_suggested`` users left without a lodge whose name
+            resembles one
+    """
+    result = {'approved': 0, 'existing_users': [], 'lodges_not_found': [], 'lodges_suggested': []}
+    setup = get_setup()
+
+    with transaction.atomic():
+        pending = list(
+            UserRequest.objects
+            .select_for_update()
+            .filter(pk__in=user_requests.values('pk'), approved=False)
+            .order_by('pk')
+        )
+        # Usernames are stored as typed (see ``create_users``) but must not
+        # repeat an existing one in another case.
+        usernames = {request.pk: CustomUser.normalize_username(request.email).lower() for request in pending}
+        taken = set(
+            CustomUser.objects
+            .annotate(username_lower=Lower('username'))
+            .filter(username_lower__in=usernames.values())
+            .values_list('username_lower', flat=True)
+        )
+
+        accepted = []
+        for request in pending:
+            if usernames[request.pk] in taken:
+                result['existing_users'].append(request.email)
+                continue
+            taken.add(usernames[request.pk])
+            accepted.append(request)
+
+        if not accepted:
+            return result
+
+        numbers = {request.pk: normalize_lodge_number(request.lodge_number) for request in accepted}
+        by_number = Lodge.objects.in_bulk(set(numbers.values()) - {None}, field_name='number')
+        lodges = {request.pk: by_number.get(numbers[request.pk]) for request in accepted}
+
+        passwords = [get_random_string(12) for _ in accepted]
+        users = create_users(
+            [
+                CustomUser(
+                    username=request.email,
+                    email=request.email,
+                    first_name=request.name,
+                    last_name=request.surname,
+                    phone_number=request.phone,
+                    profession_id=request.profession_id,
+                    is_staff=True
+                )
+                for request in accepted
+            ],
+            passwords
+        )
+
+        memberships = []
+        for request, user in zip(accepted, users):
+            lodge = lodges[request.pk]
+            if lodge is None:
+                result['lodges_not_found'].append(request.lodge_number)
+                logger.warning(f"Lodge with number {request.lodge_number} not found for user {request.email}")
+                match = get_lodge_index().best_match(request.lodge_name)
+                if match:
+                    # A fuzzy name match never grants membership on its own.
+                    result['lodges_suggested'].append(f'{request.email} → {match.name}')
+                    logger.warning(f"Lodge {match.name} suggested by name for user {request.email}, not linked")
+                continue
+            memberships.append((user, lodge))
+        link_lodges(memberships)
+
+        UserRequest.objects.filter(pk__in=[request.pk for request in accepted]).update(
+            approved=True,
+            updated_at=timezone.now()
+        )
+
+        if setup:
+            for request, password in zip(accepted, passwords):
+                send_email_notification(
+                    subject='Sua solicitação de cadastro foi aprovada',
+                    template_name='email/user_request_approval.html',
+                    context={
+                        'user': request,
+                        'password': password,
+                        'login_url': setup.url
+                    },
+                    recipient_list=[request.email]
+                )
+        else:
+            logger.warning(f"No Setup configuration found. Approval emails not sent for {len(accepted)} users")
+
+    result['approved'] = len(accepted)
+    logger.info(f"{len(accepted)} user requests approved in bulk")
+    return result
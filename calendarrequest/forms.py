@@ -16,6 +16,10 @@ class UserRequestForm(forms.ModelForm):
         self.fields['profession'].queryset = Profession.objects.filter(is_active=True).order_by('name')
         self.fields['profession'].empty_label = "Selecione sua profissão"
 
+    def clean_email(self):
+        # Stored lowercase so repeated signups are found with an indexed lookup
+        return self.cleaned_data['email'].lower()
+
     class Meta:
         model = UserRequest
         fields = ['name', 'surname', 'email', 'phone', 'profession', 'lodge_name', 'lodge_number', 'message']
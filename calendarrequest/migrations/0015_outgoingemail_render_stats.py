@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendarrequest', '0014_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='render_time_ms',
+            field=models.FloatField(blank=True, null=True, verbose_name='Tempo de renderização (ms)'),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='template_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Template'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:53
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    # The form now stores emails lowercase; repeated signups are looked up by
+    # exact match, so older requests must be lowercase too.
+    UserRequest = apps.get_model('calendarrequest', 'UserRequest')
+    UserRequest.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendarrequest', '0015_outgoingemail_render_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userrequest',
+            index=models.Index(fields=['email', 'approved'], name='userrequest_email_approved_idx'),
+        ),
+    ]
@@ -5,16 +5,21 @@ from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 from core.behaviours.trackable import Trackable
 from core.utils.choices import CITY
 from .utils import send_email_notification
 
-from setup.models import Setup
+from setup.models import get_setup
 
 from events.models import Event
 
 from lodge.models import Lodge
+from lodge.matching import get_lodge_index
+from lodge.utils import lodge_key
+
+from accounts.provisioning import create_users, link_lodges
 
 CustomUser = get_user_model()
 
@@ -63,7 +68,7 @@ class StoreRequest(Trackable):
 @receiver(post_save, sender=StoreRequest)
 def create_lodge_on_approval(sender, instance, created, **kwargs):
     logger = logging.getLogger(__name__)
-    setup = Setup.objects.last()
+    setup = get_setup()
 
     if created and setup:
         # Use transaction.on_commit to avoid transaction issues
@@ -98,13 +103,17 @@ def _create_lodge_and_notify(instance, setup, logger):
     Helper function to create lodge and send approval notification after transaction commit
     """
     try:
-        lodge, created = Lodge.objects.get_or_create(
-            name=instance.name,
-            defaults={
-                'city': instance.city,
-                'number': instance.number,
-            }
-        )
+        lodge = Lodge.objects.by_number(instance.number).first() if instance.number else None
+        created = False
+        if lodge is None:
+            lodge, created = Lodge.objects.get_or_create(
+                key=lodge_key(instance.name),
+                defaults={
+                    'name': instance.name,
+                    'city': instance.city,
+                    'number': instance.number,
+                }
+            )
         
         logger.info(f"Lodge {'created' if created else 'found'}: {lodge.name}")
         
@@ -205,6 +214,9 @@ class UserRequest(Trackable):
     class Meta:
         verbose_name = 'Solicitação de Usuário'
         verbose_name_plural = 'Solicitações de Usuário'
+        indexes = [
+            models.Index(fields=['email', 'approved'], name='userrequest_email_approved_idx'),
+        ]
 
 
 @receiver(post_save, sender=UserRequest)
@@ -222,43 +234,39 @@ def _create_user_and_notify(instance, logger):
     """
     Helper function to create user and send notifications after transaction commit
     """
-    setup = Setup.objects.last()
+    setup = get_setup()
     random_password = get_random_string(12)
 
     try:
-        # Create the user
-        user = CustomUser.objects.create_user(
-            username=instance.email,
-            email=instance.email,
-            password=random_password,
-            first_name=instance.name,
-            last_name=instance.surname,
-            phone_number=instance.phone,
-            profession=instance.profession,
-            is_staff=True
+        # Same path as the bulk approval; a single password is hashed in-process
+        user, = create_users(
+            [
+                CustomUser(
+                    username=instance.email,
+                    email=instance.email,
+                    first_name=instance.name,
+                    last_name=instance.surname,
+                    phone_number=instance.phone,
+                    profession=instance.profession,
+                    is_staff=True
+                )
+            ],
+            [random_password]
         )
-        
+
         logger.info(f"User created successfully: {user.email}")
-        
-        # Try to find and associate the lodge
-        try:
-            from lodge.models import Lodge
-            lodge = Lodge.objects.get(number=instance.lodge_number)
-            
-            # Create UserLodge association
-            from accounts.models import UserLodge
-            UserLodge.objects.create(
-                user=user,
-                lodge=lodge
-            )
-            
+
+        lodge = Lodge.objects.by_number(instance.lodge_number).first()
+        if lodge:
+            link_lodges([(user, lodge)])
             logger.info(f"User {user.email} associated with lodge {lodge.name}")
-            
-        except Lodge.DoesNotExist:
+        else:
             logger.warning(f"Lodge with number {instance.lodge_number} not found for user {instance.email}")
-        except Exception as e:
-            logger.error(f"Error associating user with lodge: {e}")
-        
+            # A fuzzy name match never grants membership on its own.
+            match = get_lodge_index().best_match(instance.lodge_name)
+            if match:
+                logger.warning(f"Lodge {match.name} suggested by name for user {instance.email}, not linked")
+
         # Send approval email with password only if setup exists
         if setup:
             try:
@@ -280,3 +288,42 @@ def _create_user_and_notify(instance, logger):
         
     except Exception as e:
         logger.error(f"Error creating user for {instance.email}: {e}")
+
+
+class OutgoingEmail(Trackable):
+    """
+    Email queued by ``send_email_notification`` and delivered by the
+    ``send_queued_emails`` management command over a single SMTP connection.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pendente'),
+        (SENT, 'Enviado'),
+        (FAILED, 'Falhou'),
+    )
+
+    subject = models.CharField('Assunto', max_length=255)
+    body = models.TextField('Texto', blank=True)
+    html_body = models.TextField('HTML', blank=True)
+    from_email = models.CharField('Remetente', max_length=255)
+    recipients = models.TextField('Destinatários', help_text='Endereços separados por vírgula')
+    status = models.CharField('Status', max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Tentativas', default=0)
+    next_attempt_at = models.DateTimeField('Próxima tentativa', default=timezone.now)
+    last_error = models.TextField('Último erro', blank=True)
+    sent_at = models.DateTimeField('Enviado em', blank=True, null=True)
+    template_name = models.CharField('Template', max_length=255, blank=True)
+    render_time_ms = models.FloatField('Tempo de renderização (ms)', blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} - {self.recipients}"
+
+    class Meta:
+        verbose_name = 'Email'
+        verbose_name_plural = 'Emails'
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='calendarreq_email_status_idx'),
+        ]
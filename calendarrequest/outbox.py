@@ -0,0 +1,147 @@
+import logging
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+CLAIM_SIZE = 50
+RETRY_BASE_DELAY = timedelta(minutes=1)
+
+
+def send_queued_emails(connection=None, limit=200):
+    """
+    Deliver pending ``OutgoingEmail`` rows over one reused SMTP connection.
+
+    No transaction or row lock is held while talking to SMTP: each group is
+    claimed in a short transaction that counts the attempt and pushes
+    ``next_attempt_at`` back by the retry delay, then every message is sent
+    and its result saved on its own. A worker killed mid-batch only resends
+    the message it was sending, after that delay.
+
+    The connection is only reopened after the server drops it. When it
+    cannot be opened, the remaining claimed emails are rescheduled and the
+    run stops, so an unreachable server costs one timeout per run.
+
+    Args:
+        connection: Email backend instance. Defaults to ``get_connection()``,
+            opened once for the whole run.
+        limit (int): Maximum number of emails handled in this run
+
+    Returns:
+        dict: Number of emails per resulting status
+    """
+    results = {OutgoingEmail.SENT: 0, OutgoingEmail.PENDING: 0, OutgoingEmail.FAILED: 0}
+    connection = connection or get_connection()
+    processed = 0
+
+    try:
+        while processed < limit:
+            emails = _claim(min(CLAIM_SIZE, limit - processed))
+            if not emails:
+                break
+            processed += len(emails)
+
+            for index, email in enumerate(emails):
+                if email.status == OutgoingEmail.FAILED:
+                    results[email.status] += 1
+                    continue
+                try:
+                    # Opening explicitly keeps the session alive across
+                    # messages; the backend would otherwise connect and
+                    # quit for every send(). It is a no-op while the
+                    # connection is open.
+                    connection.open()
+                except Exception as e:
+                    # The server is unreachable: reschedule the rest of
+                    # the batch instead of waiting on it for every row.
+                    for unsent in emails[index:]:
+                        if unsent.status != OutgoingEmail.FAILED:
+                            _mark_failed_attempt(unsent, e)
+                        results[unsent.status] += 1
+                    return results
+                _send(email, connection)
+                results[email.status] += 1
+    finally:
+        connection.close()
+
+    return results
+
+
+def _claim(size):
+    """
+    Claim the next pending emails and commit the claim.
+
+    Each claimed email has its attempt counted and ``next_attempt_at`` set
+    to the retry time, so no other run picks it up while it is being sent.
+    Emails whose earlier attempts never had their result saved give up
+    after ``MAX_ATTEMPTS``.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('id')[:size]
+        )
+        for email in emails:
+            if email.attempts >= MAX_ATTEMPTS:
+                _mark_failed_attempt(email, 'The result of the last attempt was not recorded')
+                continue
+            email.attempts += 1
+            email.next_attempt_at = timezone.now() + _retry_delay(email)
+            email.save(update_fields=['attempts', 'next_attempt_at', 'updated_at'])
+    return emails
+
+
+def _retry_delay(email):
+    return RETRY_BASE_DELAY * (2 ** (email.attempts - 1))
+
+
+def _send(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients.split(','),
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+
+    try:
+        message.send(fail_silently=False)
+    except Exception as e:
+        if isinstance(e, SMTPServerDisconnected):
+            # Let the backend reconnect on the next message.
+            connection.close()
+        _mark_failed_attempt(email, e)
+        return
+
+    # Bodies may carry temporary passwords; keep only the metadata once sent.
+    email.status = OutgoingEmail.SENT
+    email.sent_at = timezone.now()
+    email.body = ''
+    email.html_body = ''
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'body', 'html_body', 'attempts', 'last_error', 'updated_at'])
+
+
+def _mark_failed_attempt(email, error):
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+        logger.error(f"Giving up on email '{email.subject}' to {email.recipients}: {error}")
+    else:
+        email.next_attempt_at = timezone.now() + _retry_delay(email)
+        logger.warning(
+            f"Error sending email '{email.subject}' to {email.recipients} "
+            f"(attempt {email.attempts}), retrying at {email.next_attempt_at}: {error}"
+        )
+    email.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'updated_at'])
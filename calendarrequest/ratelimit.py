@@ -0,0 +1,116 @@
+"""
+Token bucket rate limiting for the public signup form, stored in Django's cache.
+
+Each bucket holds up to N tokens and refills at N per period ("10/h" allows
+a burst of 10 and then one every 6 minutes). Buckets and counters live in
+the default cache: with the per-process LocMemCache each gunicorn worker
+keeps its own, so point ``CACHE_BACKEND`` at a shared cache (database,
+Redis, memcached) for limits that hold across workers. Reading and writing
+a bucket is not atomic, so concurrent requests can occasionally take one
+token too many; that is fine for shedding floods.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+COUNTERS = ('accepted', 'deduplicated', 'limited_ip', 'limited_email')
+
+
+def parse_rate(rate):
+    """
+    Parse a ``'<requests>/<period>'`` rate such as ``'10/h'``.
+
+    Returns:
+        tuple: (capacity, period in seconds)
+    """
+    requests, period = rate.split('/')
+    return int(requests), PERIODS[period]
+
+
+def take_token(bucket, rate):
+    """
+    Take one token from a bucket.
+
+    Args:
+        bucket (str): Bucket name, e.g. ``'ip:203.0.113.7'``
+        rate (str): Bucket size and refill, e.g. ``'10/h'``
+
+    Returns:
+        float: 0 when the token was taken, otherwise seconds until one is available
+    """
+    capacity, period = parse_rate(rate)
+    refill = capacity / period
+    key = f'ratelimit:{bucket}'
+    now = time.time()
+
+    tokens, updated_at = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated_at) * refill)
+    if tokens < 1:
+        cache.set(key, (tokens, now), period)
+        return (1 - tokens) / refill
+
+    cache.set(key, (tokens - 1, now), period)
+    return 0
+
+
+def client_ip(request):
+    """
+    Return the client address, trusting ``RATELIMIT_TRUSTED_PROXIES`` proxies.
+
+    Each trusted proxy appends the address it received the request from to
+    ``X-Forwarded-For``, so the client is the entry that many places from
+    the right; anything further left can be forged by the client.
+    """
+    proxies = settings.RATELIMIT_TRUSTED_PROXIES
+    if proxies:
+        forwarded = [
+            address.strip()
+            for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+            if address.strip()
+        ]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_signup(request):
+    """
+    Take a token from the IP and email buckets of a signup POST.
+
+    Runs before form validation, so a flood costs two cache round trips
+    per request and nothing else. The email bucket is only taken when the
+    IP bucket allowed the request.
+
+    Returns:
+        float: 0 when allowed, otherwise seconds the client should wait
+    """
+    retry_after = take_token(f'signup:ip:{client_ip(request)}', settings.SIGNUP_RATE_LIMIT_IP)
+    if retry_after:
+        count('limited_ip')
+        return retry_after
+
+    email = request.POST.get('email', '').strip().lower()[:254]
+    if email:
+        retry_after = take_token(f'signup:email:{email}', settings.SIGNUP_RATE_LIMIT_EMAIL)
+        if retry_after:
+            count('limited_email')
+    return retry_after
+
+
+def count(name):
+    """Increment a signup counter; counters never expire."""
+    key = f'ratelimit:signup:count:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def counters():
+    """Return every signup counter, for monitoring."""
+    values = cache.get_many([f'ratelimit:signup:count:{name}' for name in COUNTERS])
+    return {name: values.get(f'ratelimit:signup:count:{name}', 0) for name in COUNTERS}
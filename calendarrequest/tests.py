@@ -1,3 +1,378 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.smtp import EmailBackend
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser, UserLodge
+from events.models import Event
+from lodge.matching import get_lodge_index
+from lodge.models import Lodge
+from setup.models import Profession, Setup
+from . import ratelimit, utils
+from .approval import approve_user_requests
+from .models import StoreRequest, CancelEventRequest, UserRequest, OutgoingEmail
+from .outbox import send_queued_emails
+from .utils import send_email_notification
+
+
+class EmailOutboxTests(TestCase):
+    def _queue(self, count):
+        for number in range(count):
+            send_email_notification(
+                subject=f'Solicitação {number}',
+                template_name='email/user_request_confirmation.html',
+                context={'user_request': {'name': 'Fulano'}},
+                recipient_list=[f'irmao{number}@example.com']
+            )
+
+    def test_notification_is_queued_not_sent(self):
+        self._queue(1)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.PENDING)
+
+    def test_worker_sends_over_one_connection(self):
+        self._queue(3)
+
+        with mock.patch('django.core.mail.backends.smtp.smtplib.SMTP_SSL') as smtp:
+            results = send_queued_emails(connection=EmailBackend(use_ssl=True))
+
+        self.assertEqual(results[OutgoingEmail.SENT], 3)
+        self.assertEqual(smtp.call_count, 1)
+        self.assertEqual(smtp.return_value.sendmail.call_count, 3)
+        self.assertFalse(OutgoingEmail.objects.exclude(html_body='').exists())
+
+    def test_worker_killed_mid_batch_keeps_sent_emails(self):
+        self._queue(3)
+
+        with mock.patch('django.core.mail.backends.smtp.smtplib.SMTP_SSL') as smtp:
+            smtp.return_value.sendmail.side_effect = [{}, KeyboardInterrupt]
+            with self.assertRaises(KeyboardInterrupt):
+                send_queued_emails(connection=EmailBackend(use_ssl=True))
+
+        self.assertEqual(
+            list(OutgoingEmail.objects.order_by('id').values_list('status', 'attempts')),
+            [(OutgoingEmail.SENT, 1), (OutgoingEmail.PENDING, 1), (OutgoingEmail.PENDING, 1)]
+        )
+        self.assertFalse(OutgoingEmail.objects.filter(next_attempt_at__lte=timezone.now()).exists())
+        self.assertEqual(send_queued_emails(connection=EmailBackend(use_ssl=True))[OutgoingEmail.SENT], 0)
+
+    def test_unreachable_server_reschedules_the_batch(self):
+        self._queue(3)
+
+        with mock.patch(
+            'django.core.mail.backends.smtp.smtplib.SMTP_SSL', side_effect=TimeoutError('timed out')
+        ) as smtp:
+            results = send_queued_emails(connection=EmailBackend(use_ssl=True))
+
+        self.assertEqual(smtp.call_count, 1)
+        self.assertEqual(results[OutgoingEmail.PENDING], 3)
+        self.assertEqual(set(OutgoingEmail.objects.values_list('attempts', flat=True)), {1})
+        self.assertFalse(OutgoingEmail.objects.filter(next_attempt_at__lte=timezone.now()).exists())
+
+
+@override_settings(TEMPLATES=[{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {'loaders': [('django.template.loaders.locmem.Loader', {
+        'email/teste.html': '<html><head><title>Título</title><style>p { color: red; }</style></head>'
+                            '<body>\n<p>Olá, {{ name }}</p>\n<a href="{{ url }}">Acessar</a>\n</body></html>',
+        'email/com_texto.html': '<p>Olá, {{ name }}</p>',
+        'email/com_texto.txt': 'Versão texto para {{ name }}',
+    })]},
+}])
+class EmailRenderTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.dict(utils._compiled_templates, clear=True).start()
+        mock.patch.dict(utils._render_stats, clear=True).start()
+
+    def test_templates_are_compiled_once(self):
+        with mock.patch('calendarrequest.utils.get_template', wraps=utils.get_template) as get_template:
+            first = utils.render_email('email/teste.html', {'name': 'Fulano'})
+            second = utils.render_email('email/teste.html', {'name': 'Fulano'})
+
+        self.assertEqual(get_template.call_count, 2)  # the HTML template and the missing .txt
+        self.assertEqual(first[:2], second[:2])
+
+    def test_txt_sibling_overrides_generated_text(self):
+        html_message, plain_message, _ = utils.render_email('email/com_texto.html', {'name': 'Fulano'})
+
+        self.assertEqual(html_message, '<p>Olá, Fulano</p>')
+        self.assertEqual(plain_message, 'Versão texto para Fulano')
+
+    def test_generated_text_keeps_links_and_is_not_escaped(self):
+        _, plain_message, _ = utils.render_email(
+            'email/teste.html', {'name': 'João & <Filhos>', 'url': 'https://example.com/?a=1&b=2'}
+        )
+
+        self.assertEqual(plain_message, 'Olá, João & <Filhos>\nAcessar: https://example.com/?a=1&b=2')
+
+    def test_render_stats_per_template(self):
+        utils.render_email('email/teste.html', {'name': 'Fulano'})
+        utils.render_email('email/teste.html', {'name': 'Fulano'})
+        utils.render_email('email/com_texto.html', {'name': 'Fulano'})
+
+        stats = utils.get_render_stats()
+        self.assertEqual(set(stats), {'email/teste.html', 'email/com_texto.html'})
+        self.assertEqual(stats['email/teste.html']['count'], 2)
+        self.assertEqual(stats['email/com_texto.html']['count'], 1)
+        self.assertAlmostEqual(stats['email/teste.html']['avg_ms'], stats['email/teste.html']['total_ms'] / 2)
+        self.assertGreaterEqual(stats['email/teste.html']['max_ms'], stats['email/teste.html']['avg_ms'])
+
+
+class RequestAdminQueryTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        self.client.force_login(self.admin_user)
+        self.lodge = Lodge.objects.create(name='Loja Bench', city='NITEROI', number='1')
+        self.profession = Profession.objects.create(name='ENGENHEIRO')
+        self.created = 0
+        # The lodge suggestions index is built once per worker, not per page.
+        get_lodge_index()
+
+    def _create_requests(self, count):
+        start = timezone.now()
+        for _ in range(count):
+            self.created += 1
+            user = CustomUser.objects.create_user(username=f'irmao{self.created}')
+            event = Event.objects.bulk_create([Event(
+                user=user, lodge=self.lodge, title=f'Sessão {self.created}',
+                start_time=start, end_time=start, address='Rua A, 1'
+            )])[0]
+            StoreRequest.objects.bulk_create([StoreRequest(user=user, name=f'LOJA {self.created}', city='NITEROI')])
+            CancelEventRequest.objects.create(user=user, event=event)
+            UserRequest.objects.bulk_create([UserRequest(
+                name=f'Irmão {self.created}', surname='Silva', email=f'irmao{self.created}@example.com',
+                phone='21999999999', profession=self.profession, lodge_name='Loja Bench', lodge_number='1'
+            )])
+
+    def test_changelists_query_count_does_not_grow_with_rows(self):
+        urls = [
+            '/admin/calendarrequest/storerequest/',
+            '/admin/calendarrequest/canceleventrequest/',
+            '/admin/calendarrequest/userrequest/',
+        ]
+        self._create_requests(2)
+        baselines = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as baseline:
+                self.client.get(url)
+            baselines[url] = len(baseline.captured_queries)
+
+        self._create_requests(20)
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(baselines[url]):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+
+class UserRequestViewTests(TestCase):
+    url = '/calendar/user-request/'
+
+    def setUp(self):
+        Setup.objects.create(
+            url='http://localhost:8000',
+            calendar_url='https://calendar.google.com/calendar',
+            admin_email='admin@example.com'
+        )
+        self.profession = Profession.objects.create(name='ENGENHEIRO')
+        cache.clear()
+
+    def _data(self, email='fulano@example.com'):
+        return {
+            'name': 'Fulano',
+            'surname': 'Silva',
+            'email': email,
+            'phone': '21999999999',
+            'profession': self.profession.pk,
+            'lodge_name': 'Loja Exemplo',
+            'lodge_number': '123',
+            'terms_accepted': 'on',
+        }
+
+    async def test_get_renders_form(self):
+        response = await self.async_client.get(self.url)
+
+        self.assertContains(response, 'ENGENHEIRO')
+
+    async def test_post_saves_request_and_queues_emails(self):
+        response = await self.async_client.post(self.url, self._data())
+
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertTrue(await UserRequest.objects.filter(email='fulano@example.com').aexists())
+        self.assertEqual(await OutgoingEmail.objects.acount(), 2)
+
+    async def test_invalid_post_shows_errors(self):
+        response = await self.async_client.post(self.url, {'name': 'Fulano'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await UserRequest.objects.aexists())
+
+    async def test_repeated_submission_is_merged_into_pending_request(self):
+        await self.async_client.post(self.url, self._data())
+        response = await self.async_client.post(
+            self.url, {**self._data('Fulano@Example.com'), 'phone': '21988888888', 'lodge_number': '124'}
+        )
+
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertEqual(await UserRequest.objects.acount(), 1)
+        user_request = await UserRequest.objects.aget()
+        self.assertEqual((user_request.phone, user_request.lodge_number), ('21988888888', '124'))
+        self.assertEqual(await OutgoingEmail.objects.acount(), 2)
+        self.assertEqual(ratelimit.counters()['deduplicated'], 1)
+
+    def test_ip_flood_gets_429_before_validation(self):
+        with self.settings(SIGNUP_RATE_LIMIT_IP='2/h'):
+            for _ in range(2):
+                self.client.post(self.url, {'name': 'Fulano'})
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, self._data())
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 1000)
+        self.assertEqual(queries.captured_queries, [])
+        self.assertEqual(ratelimit.counters()['limited_ip'], 1)
+
+    async def test_email_bucket_limits_across_addresses(self):
+        with self.settings(SIGNUP_RATE_LIMIT_EMAIL='1/h', RATELIMIT_TRUSTED_PROXIES=1):
+            first = await self.async_client.post(self.url, self._data(), HTTP_X_FORWARDED_FOR='198.51.100.1')
+            second = await self.async_client.post(self.url, self._data(), HTTP_X_FORWARDED_FOR='198.51.100.2')
+
+        self.assertEqual(first.status_code, 302)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(ratelimit.counters()['limited_email'], 1)
+
+    def test_client_ip_only_trusts_configured_proxies(self):
+        request = RequestFactory().post(
+            self.url, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7'
+        )
+
+        self.assertEqual(ratelimit.client_ip(request), '10.0.0.1')
+        with self.settings(RATELIMIT_TRUSTED_PROXIES=1):
+            self.assertEqual(ratelimit.client_ip(request), '203.0.113.7')
+
+    def test_stats_view_is_staff_only(self):
+        ratelimit.count('accepted')
+        self.assertEqual(self.client.get('/calendar/user-request/stats/').status_code, 302)
+
+        staff = CustomUser.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/calendar/user-request/stats/')
+
+        self.assertEqual(response.json()['accepted'], 1)
+
+
+class BulkApprovalTests(TestCase):
+    def setUp(self):
+        Setup.objects.create(
+            url='http://localhost:8000',
+            calendar_url='https://calendar.google.com/calendar',
+            admin_email='admin@example.com'
+        )
+        self.lodge = Lodge.objects.create(name='Loja Teste', city='NITEROI', number='10')
+        self.admin_user = CustomUser.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        CustomUser.objects.create_user(username='existente@example.com', email='existente@example.com')
+        self.requests = [
+            UserRequest.objects.create(
+                name=f'Irmão {number}',
+                surname='Silva',
+                email=email,
+                phone='21999999999',
+                lodge_name=lodge_name,
+                lodge_number=lodge_number
+            )
+            for number, (email, lodge_name, lodge_number) in enumerate([
+                ('um@example.com', 'Loja Teste', '10'),
+                ('dois@example.com', 'Loja Teste', '10'),
+                ('tres@example.com', 'Loja Teste', '999'),
+                ('quatro@example.com', 'Loja Desconhecida', '998'),
+                ('existente@example.com', 'Loja Teste', '10'),
+            ])
+        ]
+
+    def test_admin_action_creates_users_in_bulk(self):
+        self.client.force_login(self.admin_user)
+        response = self.client.post('/admin/calendarrequest/userrequest/', {
+            'action': 'approve_selected',
+            '_selected_action': [request.pk for request in self.requests],
+        }, follow=True)
+
+        self.assertContains(response, '4 solicitação(ões) aprovada(s).')
+        self.assertContains(response, 'existente@example.com')
+        self.assertContains(response, 'Loja não encontrada para os números: 998, 999.')
+        self.assertContains(response, 'tres@example.com → LOJA TESTE')
+
+        users = CustomUser.objects.filter(
+            username__in=['um@example.com', 'dois@example.com', 'tres@example.com', 'quatro@example.com']
+        )
+        self.assertEqual(users.count(), 4)
+        self.assertTrue(all(user.is_staff and user.has_usable_password() for user in users))
+        self.assertEqual(
+            sorted(UserLodge.objects.filter(lodge=self.lodge).values_list('user__username', flat=True)),
+            ['dois@example.com', 'um@example.com']
+        )
+        self.assertEqual(UserRequest.objects.filter(approved=True).count(), 4)
+        self.assertFalse(UserRequest.objects.get(email='existente@example.com').approved)
+        self.assertEqual(OutgoingEmail.objects.filter(template_name='email/user_request_approval.html').count(), 4)
+
+    def test_change_form_lists_lodge_suggestions(self):
+        self.client.force_login(self.admin_user)
+        response = self.client.get(f'/admin/calendarrequest/userrequest/{self.requests[2].pk}/change/')
+
+        self.assertContains(response, f'/admin/lodge/lodge/{self.lodge.pk}/change/')
+        self.assertContains(response, 'LOJA TESTE Nº 10')
+
+    def test_emailed_password_matches_hash(self):
+        approve_user_requests(UserRequest.objects.filter(email='um@example.com'))
+
+        email = OutgoingEmail.objects.get(recipients='um@example.com')
+        user = CustomUser.objects.get(username='um@example.com')
+        self.assertTrue(any(user.check_password(word) for word in email.body.split()))
+
+    def test_existing_username_in_another_case_is_left_pending(self):
+        CustomUser.objects.create_user(username='joao@Example.com', email='joao@example.com')
+        request = UserRequest.objects.create(
+            name='João', surname='Souza', email='joao@Example.com', phone='21999999999',
+            lodge_name='Loja Teste', lodge_number='10'
+        )
+
+        result = approve_user_requests(UserRequest.objects.filter(pk=request.pk))
+
+        self.assertEqual(result['approved'], 0)
+        self.assertEqual(result['existing_users'], ['joao@Example.com'])
+        self.assertEqual(CustomUser.objects.filter(username__iexact='joao@example.com').count(), 1)
+
+    def test_approving_twice_does_not_duplicate_users(self):
+        approve_user_requests(UserRequest.objects.all())
+        result = approve_user_requests(UserRequest.objects.filter(approved=True))
+
+        self.assertEqual(result['approved'], 0)
+        self.assertEqual(CustomUser.objects.filter(username='um@example.com').count(), 1)
+
+    def test_single_approval_signal_uses_provisioning(self):
+        request = self.requests[0]
+        request.approved = True
+        with self.captureOnCommitCallbacks(execute=True):
+            request.save()
+
+        user = CustomUser.objects.get(username='um@example.com')
+        self.assertTrue(user.has_usable_password())
+        self.assertTrue(UserLodge.objects.filter(user=user, lodge=self.lodge).exists())
+
+    def test_single_approval_only_suggests_lodge_by_name(self):
+        request = self.requests[2]
+        request.approved = True
+        with self.assertLogs('calendarrequest.models', 'WARNING') as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                request.save()
+
+        self.assertTrue(CustomUser.objects.filter(username='tres@example.com').exists())
+        self.assertFalse(UserLodge.objects.filter(user__username='tres@example.com').exists())
+        self.assertIn('Lodge LOJA TESTE suggested by name for user tres@example.com', '\n'.join(logs.output))
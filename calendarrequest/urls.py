@@ -5,4 +5,5 @@ app_name = 'calendarrequest'
 
 urlpatterns = [
     path('user-request/', views.user_request_view, name='user_request'),
+    path('user-request/stats/', views.user_request_stats_view, name='user_request_stats'),
 ] 
\ No newline at end of file
@@ -1,27 +1,125 @@
-from django.core.mail import send_mail
+import html
+import logging
+import re
+import threading
+import time
+
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.template import TemplateDoesNotExist, engines
+from django.template.loader import get_template
 from django.utils.html import strip_tags
 
+logger = logging.getLogger(__name__)
+
+_STYLE_RE = re.compile(r'<(style|script|title)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+_LINK_RE = re.compile(r'<a\b[^>]*\bhref="([^"]+)"[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+_compiled_templates = {}
+_render_stats = {}
+_render_stats_lock = threading.Lock()
+
 
 def send_email_notification(subject, template_name, context, recipient_list):
     """
-    Helper function to send HTML emails with plain text fallback.
-    
+    Helper function to queue HTML emails with plain text fallback.
+
+    The message is rendered now and stored as an ``OutgoingEmail``; the
+    ``send_queued_emails`` command delivers it, so callers never wait on SMTP.
+    When called inside a transaction the email is only sent if it commits.
+
     Args:
         subject (str): Email subject
         template_name (str): Path to the HTML template
         context (dict): Context data for the template
         recipient_list (list): List of recipient email addresses
+
+    Returns:
+        OutgoingEmail: The queued message
+    """
+    from .models import OutgoingEmail
+
+    html_message, plain_message, render_time_ms = render_email(template_name, context)
+
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=plain_message,
+        html_body=html_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=','.join(recipient_list),
+        template_name=template_name,
+        render_time_ms=render_time_ms,
+    )
+
+
+def render_email(template_name, context):
+    """
+    Render the HTML and plain text parts of a notification email.
+
+    Both templates are compiled once per process. The text part comes from
+    ``<name>.txt`` next to the HTML template when it exists, otherwise from a
+    text template derived once from the HTML source (see ``_text_source``).
+
+    Args:
+        template_name (str): Path to the HTML template
+        context (dict): Context data for the template
+
+    Returns:
+        tuple: (html message, plain message, render time in milliseconds)
+    """
+    html_template, text_template = _get_compiled_templates(template_name)
+
+    started = time.perf_counter()
+    html_message = html_template.render(context)
+    plain_message = _BLANK_LINES_RE.sub('\n\n', text_template.render(context)).strip()
+    render_time_ms = (time.perf_counter() - started) * 1000
+
+    with _render_stats_lock:
+        stats = _render_stats.setdefault(template_name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stats['count'] += 1
+        stats['total_ms'] += render_time_ms
+        stats['max_ms'] = max(stats['max_ms'], render_time_ms)
+
+    logger.debug(f"Rendered {template_name} in {render_time_ms:.2f}ms")
+    return html_message, plain_message, render_time_ms
+
+
+def get_render_stats():
+    """
+    Render statistics for this process, per template.
+
+    Returns:
+        dict: template name -> {'count', 'total_ms', 'max_ms', 'avg_ms'}
+    """
+    with _render_stats_lock:
+        return {
+            name: {**stats, 'avg_ms': stats['total_ms'] / stats['count']}
+            for name, stats in _render_stats.items()
+        }
+
+
+def _get_compiled_templates(template_name):
+    templates = _compiled_templates.get(template_name)
+    if templates is None:
+        html_template = get_template(template_name)
+        try:
+            text_template = get_template(re.sub(r'\.html?$', '', template_name) + '.txt')
+        except TemplateDoesNotExist:
+            text_template = engines['django'].from_string(_text_source(html_template.template.source))
+        templates = _compiled_templates[template_name] = (html_template, text_template)
+    return templates
+
+
+def _text_source(html_source):
+    """
+    Turn an HTML email template into a plain text template.
+
+    Runs once per template instead of stripping tags from every rendered
+    message: drops ``<style>``/``<title>`` blocks, keeps link targets and
+    disables autoescaping so values are not HTML-encoded in the text part.
     """
-    html_message = render_to_string(template_name, context)
-    plain_message = strip_tags(html_message)
-
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        recipient_list,
-        html_message=html_message,
-        fail_silently=False,
-    ) 
\ No newline at end of file
+    source = _STYLE_RE.sub('', html_source)
+    source = _LINK_RE.sub(lambda match: f'{match.group(2).strip()}: {match.group(1)}', source)
+    source = html.unescape(strip_tags(source))
+    lines = [line.strip() for line in source.splitlines()]
+    return '{% autoescape off %}' + '\n'.join(lines) + '{% endautoescape %}'
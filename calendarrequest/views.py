@@ -1,4 +1,8 @@
 import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.core.mail import send_mail
@@ -6,56 +10,106 @@ from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from . import ratelimit
 from .forms import UserRequestForm
+from .models import UserRequest
 from .utils import send_email_notification
-from setup.models import Setup
+from setup.models import get_setup
 
 logger = logging.getLogger(__name__)
 
 
-def user_request_view(request):
+async def user_request_view(request):
+    """
+    Public signup form. Async so that, under ASGI (uvicorn), a request
+    waiting on the database does not hold a worker thread.
+
+    POSTs first take a token from the per-IP and per-email buckets
+    (``ratelimit``) and get a 429 without touching the database when either
+    is empty. A valid submission for an email that already has a pending
+    request updates that request instead of storing and emailing a new one.
+
+    Validation and template rendering touch the ORM and run through
+    ``sync_to_async``; the request is stored with ``asave()``. Emails are
+    only queued here; the ``send_queued_emails`` worker delivers them.
+    """
     if request.method == 'POST':
+        retry_after = await sync_to_async(ratelimit.check_signup)(request)
+        if retry_after:
+            logger.warning(f"Signup rate limited for {ratelimit.client_ip(request)}")
+            response = HttpResponse(
+                'Muitas solicitações. Tente novamente mais tarde.',
+                status=429,
+                content_type='text/plain; charset=utf-8'
+            )
+            response['Retry-After'] = str(int(retry_after) + 1)
+            return response
+
         form = UserRequestForm(request.POST)
-        setup = Setup.objects.last()
-
-        if form.is_valid():
-            user_request = form.save()
-            logger.info(f"User request created: {user_request.email}")
-            
-            # Only send emails if setup exists
-            if setup:
-                try:
-                    # Send email to admin
-                    send_email_notification(
-                        subject='Nova solicitação de cadastro de usuário',
-                        template_name='email/user_request_notification.html',
-                        context={
-                            'user_request': user_request,
-                            'login_url': setup.url
-                        },
-                        recipient_list=[setup.admin_email]
-                    )
-                    logger.info(f"Admin notification sent to {setup.admin_email}")
-                except Exception as e:
-                    logger.error(f"Error sending admin notification: {e}")
-                
-                try:
-                    # Send confirmation email to user
-                    send_email_notification(
-                        subject='Sua solicitação de cadastro foi recebida',
-                        template_name='email/user_request_confirmation.html',
-                        context={'user_request': user_request},
-                        recipient_list=[user_request.email]
-                    )
-                    logger.info(f"User confirmation sent to {user_request.email}")
-                except Exception as e:
-                    logger.error(f"Error sending user confirmation: {e}")
+
+        if await sync_to_async(form.is_valid)():
+            email = form.cleaned_data['email']
+            pending = await UserRequest.objects.filter(email=email, approved=False).order_by('-pk').afirst()
+            if pending:
+                # Keep the corrections, but do not email the admin again.
+                for field in form.Meta.fields:
+                    setattr(pending, field, form.cleaned_data[field])
+                await pending.asave()
+                await sync_to_async(ratelimit.count)('deduplicated')
+                logger.info(f"Repeated user request merged into request {pending.pk}: {email}")
             else:
-                logger.warning("No Setup configuration found. Emails not sent.")
+                user_request = form.save(commit=False)
+                await user_request.asave()
+                await sync_to_async(ratelimit.count)('accepted')
+                logger.info(f"User request created: {user_request.email}")
+
+                await sync_to_async(_queue_user_request_emails)(user_request)
 
             messages.success(request, 'Sua solicitação foi enviada com sucesso! Você receberá um email quando sua solicitação for analisada.')
             return redirect('calendarrequest:user_request')
     else:
         form = UserRequestForm()
-    
-    return render(request, 'user_request.html', {'form': form})
+
+    return await sync_to_async(render)(request, 'user_request.html', {'form': form})
+
+
+@staff_member_required
+def user_request_stats_view(request):
+    """Signup counters (accepted, deduplicated, rate limited) for monitoring."""
+    return JsonResponse(ratelimit.counters())
+
+
+def _queue_user_request_emails(user_request):
+    setup = get_setup()
+
+    # Only send emails if setup exists
+    if not setup:
+        logger.warning("No Setup configuration found. Emails not sent.")
+        return
+
+    try:
+        # Send email to admin
+        send_email_notification(
+            subject='Nova solicitação de cadastro de usuário',
+            template_name='email/user_request_notification.html',
+            context={
+                'user_request': user_request,
+                'login_url': setup.url
+            },
+            recipient_list=[setup.admin_email]
+        )
+        logger.info(f"Admin notification sent to {setup.admin_email}")
+    except Exception as e:
+        logger.error(f"Error sending admin notification: {e}")
+
+    try:
+        # Send confirmation email to user
+        send_email_notification(
+            subject='Sua solicitação de cadastro foi recebida',
+            template_name='email/user_request_confirmation.html',
+            context={'user_request': user_request},
+            recipient_list=[user_request.email]
+        )
+        logger.info(f"User confirmation sent to {user_request.email}")
+    except Exception as e:
+        logger.error(f"Error sending user confirmation: {e}")
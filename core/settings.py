@@ -85,10 +85,12 @@ JAZZMIN_SETTINGS = {
         "accounts.Brother": "fas fa-users",
         "setup.Setup": "fas fa-cogs",
         "events.Event": "fas fa-calendar-alt",
+        "events.CalendarSyncOperation": "fas fa-sync",
         "lodge.Lodge": "fas fa-home",
         "calendarrequest.StoreRequest": "fas fa-home",
         "calendarrequest.EventRequest": "fas fa-calendar-alt",
         "calendarrequest.CancelEventRequest": "fas fa-calendar-times",
+        "calendarrequest.OutgoingEmail": "fas fa-envelope",
     },
 }
 
@@ -134,9 +136,68 @@ DATABASES = {
         'OPTIONS': {
             'client_encoding': 'UTF8',
         },
+        # Keep each worker's connection open between requests (0 closes it
+        # after every request) and ping it before reuse.
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+        # Set when DB_HOST points at pgbouncer in transaction pooling mode:
+        # server-side cursors (QuerySet.iterator) cannot survive it.
+        'DISABLE_SERVER_SIDE_CURSORS': env.bool('DB_PGBOUNCER', default=False),
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': env('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', default='calendario-de-eventos'),
+    }
+}
+
+# Seconds the cached Setup (setup.models.get_setup) lives in each worker
+SETUP_CACHE_TIMEOUT = env.int('SETUP_CACHE_TIMEOUT', default=300)
+
+# Public event feeds: seconds the feed validators stay cached, and the
+# Cache-Control max-age sent to calendar clients
+EVENT_FEED_CACHE_TIMEOUT = env.int('EVENT_FEED_CACHE_TIMEOUT', default=60)
+EVENT_FEED_MAX_AGE = env.int('EVENT_FEED_MAX_AGE', default=300)
+
+# Calendar backend (events.googlecalendar.backends): 'google', 'memory'
+# (offline fake), 'record' (Google + cassette) or 'replay' (cassette only)
+CALENDAR_BACKEND = env('CALENDAR_BACKEND', default='google')
+# Latency added per API request and share of failed writes in the offline backends
+CALENDAR_FAKE_LATENCY_MS = env.float('CALENDAR_FAKE_LATENCY_MS', default=0)
+CALENDAR_FAKE_FAILURE_RATE = env.float('CALENDAR_FAKE_FAILURE_RATE', default=0)
+CALENDAR_CASSETTE_PATH = env(
+    'CALENDAR_CASSETTE_PATH',
+    default=str(BASE_DIR / 'events' / 'googlecalendar' / 'cassette.jsonl')
+)
+GOOGLE_CALENDAR_TOKEN_PATH = env(
+    'GOOGLE_CALENDAR_TOKEN_PATH',
+    default=str(BASE_DIR / 'events' / 'googlecalendar' / 'token.json')
+)
+GOOGLE_CALENDAR_CREDENTIALS_PATH = env(
+    'GOOGLE_CALENDAR_CREDENTIALS_PATH',
+    default=str(BASE_DIR / 'events' / 'googlecalendar' / 'credentials.json')
+)
+
+# Seconds a worker keeps its lodge name index (lodge.matching) before
+# rebuilding it; saves in the same worker rebuild it right away
+LODGE_INDEX_TIMEOUT = env.int('LODGE_INDEX_TIMEOUT', default=300)
+
+# Public signup form token buckets, '<requests>/<s|m|h|d>' per client IP and
+# per email (calendarrequest.ratelimit). Use a shared CACHE_BACKEND for limits
+# that hold across workers.
+SIGNUP_RATE_LIMIT_IP = env('SIGNUP_RATE_LIMIT_IP', default='10/h')
+SIGNUP_RATE_LIMIT_EMAIL = env('SIGNUP_RATE_LIMIT_EMAIL', default='3/h')
+# Reverse proxies in front of the app that append to X-Forwarded-For
+RATELIMIT_TRUSTED_PROXIES = env.int('RATELIMIT_TRUSTED_PROXIES', default=0)
+
+# Bulk account provisioning (accounts.provisioning): password hashing
+# processes (0 = one per CPU) and the smallest batch worth starting them for.
+# Spawning a worker costs about as much as a few PBKDF2 hashes.
+PROVISIONING_WORKERS = env.int('PROVISIONING_WORKERS', default=0)
+PROVISIONING_PARALLEL_THRESHOLD = env.int('PROVISIONING_PARALLEL_THRESHOLD', default=16)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -165,7 +226,8 @@ STATICFILES_DIRS = [
     BASE_DIR / 'core' / 'static',
 ]
 
-STATIC_ROOT = BASE_DIR / 'staticfiles'
+# The image collects static files at build time outside the mounted /app
+STATIC_ROOT = env('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
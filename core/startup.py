@@ -0,0 +1,117 @@
+"""
+Container startup: wait for the database and migrate only when needed.
+
+Runs without ``django.setup()``: the settings module is imported for
+``DATABASES`` and ``INSTALLED_APPS``, migration files are listed from disk
+and compared with the ``django_migrations`` table over a plain psycopg2
+connection. ``manage.py migrate`` (which loads every app and model) only
+runs when a migration is missing from the table.
+
+Usage:
+    python -m core.startup [--timeout 60]
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+
+def wait_for_database(db, timeout):
+    """
+    Open a psycopg2 connection, retrying until the server accepts it.
+
+    Args:
+        db (dict): Entry of ``settings.DATABASES``
+        timeout (float): Seconds to keep trying
+
+    Returns:
+        connection: An open psycopg2 connection
+    """
+    import psycopg2
+
+    params = {
+        'dbname': db.get('NAME'),
+        'user': db.get('USER'),
+        'password': db.get('PASSWORD'),
+        'host': db.get('HOST'),
+        'port': db.get('PORT'),
+    }
+    params = {key: value for key, value in params.items() if value}
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return psycopg2.connect(connect_timeout=2, **params)
+        except psycopg2.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def migrations_on_disk(installed_apps):
+    """
+    List (app label, migration name) for every migration file of the installed apps.
+
+    Apps are located with ``importlib.util.find_spec``, so no app module or
+    model is imported.
+    """
+    migrations = set()
+    for app in installed_apps:
+        spec = importlib.util.find_spec(app)
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        label = app.rsplit('.', 1)[-1]
+        for location in spec.submodule_search_locations:
+            for path in Path(location, 'migrations').glob('[0-9]*.py'):
+                migrations.add((label, path.stem))
+    return migrations
+
+
+def applied_migrations(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('django_migrations')")
+        if cursor.fetchone()[0] is None:
+            return set()
+        cursor.execute('SELECT app, name FROM django_migrations')
+        return set(cursor.fetchall())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for the database')
+    args = parser.parse_args(argv)
+
+    settings = importlib.import_module(os.environ['DJANGO_SETTINGS_MODULE'])
+    db = settings.DATABASES['default']
+    started = time.perf_counter()
+
+    if db['ENGINE'] != 'django.db.backends.postgresql':
+        print('⚙️  Non-PostgreSQL database, running migrate')
+        pending = True
+    else:
+        print('⏳ Waiting for database...')
+        connection = wait_for_database(db, args.timeout)
+        try:
+            pending = migrations_on_disk(settings.INSTALLED_APPS) - applied_migrations(connection)
+        finally:
+            connection.close()
+
+    if pending:
+        if pending is not True:
+            print(f'🔄 {len(pending)} pending migration(s), running migrate')
+        subprocess.run([sys.executable, 'manage.py', 'migrate', '--noinput'], check=True)
+    else:
+        print('✅ Database ready, no pending migrations')
+
+    print(f'⏱️  Startup checks took {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ urlpatterns = [
     path('', RedirectView.as_view(url='/admin/', permanent=True)),
     path('admin/', admin.site.urls),
     path('calendar/', include('calendarrequest.urls')),
+    path('events/', include('events.urls')),
 ]
 
 if settings.DEBUG:
@@ -1,10 +1,53 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ERROR_FLAG, ChangeList
 from django import forms
-from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from .models import Event
+from .conflicts import find_conflicts, find_batch_conflicts
+from .export import iter_csv
+from .ical import iter_calendar
+from .models import Event, CalendarSyncOperation
+from .recurrence import parse_rule, expand_rule, build_recurring_events, create_recurring_events
 from accounts.models import UserLodge, CustomUser
+from lodge.models import Lodge
+
+EXPORT_CHUNK_SIZE = 2000
+MAX_LISTED_CONFLICTS = 5
+
+
+def _conflict_error(conflicts):
+    conflicts = sorted(conflicts, key=lambda event: event.start_time)
+    lines = [
+        f'{event} ({event.lodge or event.address})'
+        for event in conflicts[:MAX_LISTED_CONFLICTS]
+    ]
+    if len(conflicts) > MAX_LISTED_CONFLICTS:
+        lines.append(f'... e mais {len(conflicts) - MAX_LISTED_CONFLICTS}')
+    return ValidationError(
+        _('Conflito de horário com eventos na mesma loja ou endereço: %(events)s'),
+        params={'events': '; '.join(lines)},
+        code='conflict'
+    )
+
+
+class ExportChangeList(ChangeList):
+    """
+    Changelist that only builds the filtered queryset.
+
+    Skips ``get_results``: the paginator and full-result counts and the page
+    query are useless to an export and slow on large tables.
+    """
+
+    def get_results(self, request):
+        pass
 
 
 class EventAdminForm(forms.ModelForm):
@@ -22,6 +65,78 @@ class EventAdminForm(forms.ModelForm):
                 _('A data e hora de início do evento deve ser anterior à data e hora de término.')
             )
 
+        if start_time and end_time and not cleaned_data.get('is_cancelled'):
+            conflicts = list(find_conflicts(
+                start_time,
+                end_time,
+                lodge=cleaned_data.get('lodge'),
+                address=cleaned_data.get('address'),
+                exclude_pk=self.instance.pk
+            )[:MAX_LISTED_CONFLICTS + 1])
+            if conflicts:
+                raise _conflict_error(conflicts)
+
+        return cleaned_data
+
+
+class RecurringEventForm(forms.Form):
+    lodges = forms.ModelMultipleChoiceField(
+        label='Lojas',
+        queryset=Lodge.objects.none(),
+        widget=forms.SelectMultiple(attrs={'size': 10})
+    )
+    title = forms.CharField(label='Título', max_length=200)
+    description = forms.CharField(label='Descrição', widget=forms.Textarea, required=False)
+    address = forms.CharField(label='Endereço', max_length=500)
+    start_time = forms.TimeField(label='Hora de início', widget=forms.TimeInput(attrs={'type': 'time'}))
+    end_time = forms.TimeField(label='Hora de término', widget=forms.TimeInput(attrs={'type': 'time'}))
+    rule = forms.CharField(
+        label='Recorrência',
+        initial='FREQ=MONTHLY;BYDAY=2TU,4TU',
+        help_text='Formato RRULE. Ex.: FREQ=MONTHLY;BYDAY=2TU,4TU (2ª e 4ª terça do mês) '
+                  'ou FREQ=WEEKLY;INTERVAL=2;BYDAY=TH (quinta sim, quinta não).'
+    )
+    start_date = forms.DateField(label='Data inicial', widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label='Data final', widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def __init__(self, *args, lodges=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['lodges'].queryset = lodges if lodges is not None else Lodge.objects.all()
+        for field in self.fields.values():
+            field.widget.attrs.setdefault('class', 'form-control')
+
+    def clean_rule(self):
+        rule = self.cleaned_data['rule']
+        parse_rule(rule)
+        return rule
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+
+        if start_time and end_time and start_time >= end_time:
+            raise ValidationError(
+                _('A hora de início deve ser anterior à hora de término.')
+            )
+        if start_date and end_date:
+            if start_date > end_date:
+                raise ValidationError(_('A data inicial deve ser anterior à data final.'))
+            if cleaned_data.get('rule') and not expand_rule(cleaned_data['rule'], start_date, end_date):
+                raise ValidationError(_('A recorrência não gera nenhuma data no período informado.'))
+
+        if not self.errors and cleaned_data.get('lodges'):
+            events = build_recurring_events(
+                None, cleaned_data['lodges'], cleaned_data['title'], cleaned_data.get('description', ''),
+                cleaned_data['address'], start_time, end_time, cleaned_data['rule'], start_date, end_date
+            )
+            conflicts = [other for _new, other in find_batch_conflicts(events)]
+            if conflicts:
+                # Sessions of the batch itself have no pk yet.
+                raise _conflict_error(list({event.pk or id(event): event for event in conflicts}.values()))
+
         return cleaned_data
 
 
@@ -32,10 +147,110 @@ class EventAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'address', 'user__username')
     list_filter = ('start_time', 'end_time', 'created_at', 'updated_at')
     readonly_fields = ('google_event_id',)
+    list_select_related = ('lodge', 'user')
+
+    actions = ['cancel_events']
 
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if not request.user.is_superuser and 'cancel_events' in actions:
+            del actions['cancel_events']
+        return actions
+
+    def get_changelist(self, request, **kwargs):
+        if request.resolver_match and request.resolver_match.url_name == 'events_event_export':
+            return ExportChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_urls(self):
+        urls = [
+            path(
+                'recurring/',
+                self.admin_site.admin_view(self.recurring_view),
+                name='events_event_recurring'
+            ),
+            path(
+                'export/<str:export_format>/',
+                self.admin_site.admin_view(self.export_view),
+                name='events_event_export'
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def recurring_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        lodges = Lodge.objects.order_by('name')
+        if not request.user.is_superuser:
+            lodges = lodges.filter(userlodge__user=request.user).distinct()
+
+        form = RecurringEventForm(request.POST or None, lodges=lodges)
+        if request.method == 'POST' and form.is_valid():
+            events = create_recurring_events(user=request.user, **form.cleaned_data)
+            self.message_user(request, f'{len(events)} eventos foram criados.')
+            return redirect('admin:events_event_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Criar eventos recorrentes',
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/events/event/recurring_form.html', context)
+
+    def export_view(self, request, export_format):
+        """
+        Stream the events of the current changelist (search and filters
+        included) as CSV or iCalendar.
+
+        Rows are read with ``iterator()`` so memory stays flat regardless of
+        the number of events, and the changelist skips its count and page
+        queries (see ``ExportChangeList``), so the first row is sent at once.
+        """
+        if export_format not in ('csv', 'ics'):
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return redirect(f"{reverse('admin:events_event_changelist')}?{ERROR_FLAG}=1")
+        events = (
+            changelist.queryset
+            .select_related('lodge', 'user')
+            .order_by('start_time', 'pk')
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        filename = f'eventos-{timezone.localdate():%Y%m%d}.{export_format}'
+
+        if export_format == 'csv':
+            response = StreamingHttpResponse(iter_csv(events), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(
+                iter_calendar(events, 'Eventos', request.get_host()),
+                content_type='text/calendar; charset=utf-8'
+            )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def cancel_events(self, request, queryset):
+        with transaction.atomic():
+            event_ids = list(queryset.filter(is_cancelled=False).values_list('pk', flat=True))
+            Event.objects.filter(pk__in=event_ids).update(is_cancelled=True, updated_at=timezone.now())
+            # update() skips event_post_save, so queue the deletions here; the
+            # outbox worker sends them to Google in batch requests.
+            CalendarSyncOperation.objects.bulk_create([
+                CalendarSyncOperation(event_id=event_id, operation=CalendarSyncOperation.DELETE)
+                for event_id in event_ids
+            ])
+        self.message_user(request, f'{len(event_ids)} eventos foram cancelados.')
+    cancel_events.short_description = "Cancelar eventos selecionados"
+
     def change_view(self, request, object_id, form_url='', extra_context=None):
         extra_context = extra_context or {}
         obj = self.get_object(request, object_id)
@@ -77,3 +292,18 @@ class EventAdmin(admin.ModelAdmin):
         elif db_field.name == "user":
             kwargs["queryset"] = CustomUser.objects.filter(id=request.user.id)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(CalendarSyncOperation)
+class CalendarSyncOperationAdmin(admin.ModelAdmin):
+    list_display = ('event', 'operation', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status', 'operation')
+    search_fields = ('event__title', 'last_error')
+    list_select_related = ('event',)
+    readonly_fields = ('event', 'operation', 'attempts', 'last_error', 'notify', 'created_at', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
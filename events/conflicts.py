@@ -0,0 +1,183 @@
+import bisect
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import DateTimeField, F, Func, Q
+from django.db.models.functions import Greatest
+
+from .models import Event
+
+
+class EventSpan(Func):
+    """
+    ``tstzrange(start_time, greatest(start_time, end_time), '[)')``.
+
+    Matches the expression of the ``events_span_gist_idx`` GiST index
+    (PostgreSQL only). ``greatest`` keeps rows with an end before their
+    start from raising when the range is built.
+    """
+    function = 'TSTZRANGE'
+    template = "%(function)s(%(expressions)s, '[)')"
+
+    def __init__(self):
+        from django.contrib.postgres.fields import DateTimeRangeField
+
+        super().__init__(
+            F('start_time'),
+            Greatest('start_time', 'end_time'),
+            output_field=DateTimeRangeField()
+        )
+
+
+def overlapping_events(start_time, end_time):
+    """
+    Active events whose time range intersects ``[start_time, end_time)``.
+
+    On PostgreSQL the range overlap is answered by the GiST index on
+    ``EventSpan``; elsewhere it falls back to ``start < end AND end > start``,
+    which the ``(lodge, end_time)`` and ``(address, end_time)`` indexes
+    serve once the caller narrows by lodge or address.
+
+    Returns:
+        QuerySet: Non-cancelled events overlapping the interval
+    """
+    events = Event.objects.filter(is_cancelled=False)
+    if connection.vendor == 'postgresql':
+        from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+
+        return events.annotate(span=EventSpan()).filter(
+            span__overlap=DateTimeTZRange(start_time, end_time, '[)')
+        )
+    if connection.vendor == 'sqlite':
+        # SQLite cannot tell which range is selective and tends to pick
+        # (lodge, start_time), walking every past event of the lodge. A unary
+        # "+" keeps the value but takes start_time out of index selection.
+        return events.alias(
+            unindexed_start=Func(F('start_time'), template='+%(expressions)s', output_field=DateTimeField())
+        ).filter(unindexed_start__lt=end_time, end_time__gt=start_time)
+    return events.filter(start_time__lt=end_time, end_time__gt=start_time)
+
+
+def find_conflicts(start_time, end_time, lodge=None, address=None, exclude_pk=None):
+    """
+    Active events that overlap the given interval at the same lodge or address.
+
+    Args:
+        start_time (datetime): Start of the interval
+        end_time (datetime): End of the interval (exclusive)
+        lodge: Lodge (or id) whose events conflict
+        address (str): Address whose events conflict
+        exclude_pk: Event being edited, ignored in the result
+
+    Returns:
+        QuerySet: Conflicting events, unordered
+    """
+    events = overlapping_events(start_time, end_time).select_related('lodge')
+    if exclude_pk is not None:
+        events = events.exclude(pk=exclude_pk)
+
+    if connection.vendor == 'postgresql':
+        place = Q()
+        if lodge:
+            place |= Q(lodge=lodge)
+        if address:
+            place |= Q(address=address)
+        return events.filter(place) if place else Event.objects.none()
+    return _at_places(events, {'lodge': lodge} if lodge else {}, {'address': address} if address else {})
+
+
+def find_batch_conflicts(events):
+    """
+    Check many unsaved events against the database with a single query.
+
+    Loads the active events at any of the batch's lodges or addresses within
+    the batch's overall time window (served by the ``(lodge, end_time)`` and
+    ``(address, end_time)`` indexes), then matches overlaps in memory. Events
+    of the batch are also checked against each other, so two lodges of a
+    batch sharing an address conflict.
+
+    Args:
+        events (list): Unsaved Event instances
+
+    Returns:
+        list: (new event, conflicting event) tuples; the conflicting event is
+            unsaved when it belongs to the batch
+    """
+    if not events:
+        return []
+
+    lodge_ids = {event.lodge_id for event in events if event.lodge_id}
+    addresses = {event.address for event in events if event.address}
+    window = Event.objects.filter(
+        is_cancelled=False,
+        end_time__gt=min(event.start_time for event in events),
+        start_time__lt=max(event.end_time for event in events),
+    ).select_related('lodge')
+    existing = _at_places(
+        window,
+        {'lodge_id__in': lodge_ids} if lodge_ids else {},
+        {'address__in': addresses} if addresses else {}
+    )
+
+    by_place = defaultdict(list)
+    for event in sorted(existing, key=lambda event: event.start_time):
+        for place in _places(event):
+            by_place[place].append(event)
+    starts = {place: [event.start_time for event in rows] for place, rows in by_place.items()}
+
+    conflicts = []
+    for event in events:
+        found = {}
+        for place in _places(event):
+            rows = by_place.get(place, [])
+            # Rows starting before the new event ends; keep those ending after it starts.
+            for other in rows[:bisect.bisect_left(starts.get(place, []), event.end_time)]:
+                if other.end_time > event.start_time:
+                    found[other.pk] = other
+        conflicts.extend((event, other) for other in found.values())
+    return conflicts + _batch_overlaps(events)
+
+
+def _batch_overlaps(events):
+    """
+    Pairs of events of the batch that overlap at the same lodge or address.
+
+    Sorts the batch by place and start time and compares each event with the
+    one ending last among those before it at the same place.
+    """
+    by_place = sorted(
+        ((place, event) for event in events for place in _places(event)),
+        key=lambda item: (item[0], item[1].start_time)
+    )
+    overlaps = []
+    latest_place, latest = None, None
+    for place, event in by_place:
+        if place == latest_place and latest.end_time > event.start_time:
+            overlaps.append((event, latest))
+        if place != latest_place or event.end_time > latest.end_time:
+            latest_place, latest = place, event
+    return overlaps
+
+
+def _at_places(events, lodge_lookup, address_lookup):
+    """
+    Narrow ``events`` to a lodge and/or an address.
+
+    Uses ``UNION`` rather than ``OR`` so each branch can be answered by its
+    own partial index; SQLite does not combine partial indexes for an ``OR``
+    and would otherwise scan by start time. The result is left unordered for
+    the same reason: ordering makes SQLite favour the start_time indexes.
+    """
+    branches = [events.filter(**lookup) for lookup in (lodge_lookup, address_lookup) if lookup]
+    if not branches:
+        return Event.objects.none()
+    if len(branches) == 1:
+        return branches[0]
+    return branches[0].union(branches[1])
+
+
+def _places(event):
+    if event.lodge_id:
+        yield 'lodge', event.lodge_id
+    if event.address:
+        yield 'address', event.address
@@ -0,0 +1,49 @@
+import csv
+
+from django.utils import timezone
+
+CSV_HEADER = (
+    'Título', 'Loja', 'Número da loja', 'Cidade', 'Início', 'Término', 'Endereço',
+    'Descrição', 'Usuário', 'Email do usuário', 'Cancelado', 'ID do evento do Google',
+)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(events):
+    """
+    Yield a CSV report of ``events`` one row at a time.
+
+    The header (with a UTF-8 BOM so spreadsheet apps detect the encoding) is
+    yielded before ``events`` is consumed, so a streaming response sends its
+    first bytes while the query is still running.
+
+    Args:
+        events: Iterable of Event instances with ``lodge`` and ``user`` loaded
+
+    Yields:
+        str: One CSV line per event
+    """
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(CSV_HEADER)
+    for event in events:
+        lodge = event.lodge
+        yield writer.writerow((
+            event.title,
+            lodge.name if lodge else '',
+            (lodge.number or '') if lodge else '',
+            lodge.get_city_display() if lodge else '',
+            timezone.localtime(event.start_time).strftime('%d/%m/%Y %H:%M'),
+            timezone.localtime(event.end_time).strftime('%d/%m/%Y %H:%M'),
+            event.address,
+            event.description,
+            event.user.get_full_name() or event.user.username,
+            event.user.email,
+            'Sim' if event.is_cancelled else 'Não',
+            event.google_event_id or '',
+        ))
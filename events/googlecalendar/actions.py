@@ -1,46 +1,38 @@
 import os
+import threading
 import google.auth.transport.requests
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from django.conf import settings
-from setup.models import Setup
+from setup.models import get_setup
 from calendarrequest.utils import send_email_notification
+from .backends import BATCH_SIZE, SyncTokenExpired, build_event_body
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+TOKEN_PATH = settings.GOOGLE_CALENDAR_TOKEN_PATH
+CREDENTIALS_PATH = settings.GOOGLE_CALENDAR_CREDENTIALS_PATH
+
 
 class GoogleCalendarService:
-    def __init__(self):
-        self.service = self._get_calendar_service()
+    def __init__(self, service=None):
+        self.service = service or self._get_calendar_service()
         self.calendar_id = 'primary'
-        self.setup = Setup.objects.last()
+
+    @property
+    def setup(self):
+        return get_setup()
 
     def _get_calendar_service(self):
         """Initialize and return the Google Calendar service."""
-        creds = None
-        token_path = os.path.join(settings.BASE_DIR, 'events', 'googlecalendar', 'token.json')
-        credentials_path = os.path.join(settings.BASE_DIR, 'events', 'googlecalendar', 'credentials.json')
-
-        if os.path.exists(token_path):
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-        
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(google.auth.transport.requests.Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-                creds = flow.run_local_server(port=8080, access_type='offline', prompt='consent')
-            
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
-
-        return build('calendar', 'v3', credentials=creds)
+        return build('calendar', 'v3', credentials=_registry.get_credentials(), cache_discovery=False)
 
     def _send_error_notification(self, event, operation, error_message):
         """Send error notification email to admin."""
 
-        if not self.setup or not self.setup.admin_email:
+        setup = self.setup
+        if not setup or not setup.admin_email:
             return
 
         context = {
@@ -53,7 +45,7 @@ class GoogleCalendarService:
             subject=f'Erro no Google Calendar - {operation}',
             template_name='email/google_calendar_error.html',
             context=context,
-            recipient_list=[self.setup.admin_email]
+            recipient_list=[setup.admin_email]
         )
 
     def get_last_event(self):
@@ -65,6 +57,64 @@ class GoogleCalendarService:
             return events['items'][0]
         return None
 
+    def list_changes(self, sync_token=None):
+        """
+        List the events changed since the last incremental sync.
+
+        Without a sync token this is a full listing; either way every page is
+        followed and the final ``nextSyncToken`` is returned for the next run.
+        Deleted events are returned with ``status == 'cancelled'``.
+
+        Args:
+            sync_token (str): Token returned by the previous call, if any
+
+        Returns:
+            tuple: (list of Google event dicts, next sync token)
+
+        Raises:
+            SyncTokenExpired: Google no longer accepts ``sync_token``
+        """
+        items = []
+        page_token = None
+
+        while True:
+            params = {'calendarId': self.calendar_id, 'maxResults': 2500}
+            if sync_token:
+                params['syncToken'] = sync_token
+            if page_token:
+                params['pageToken'] = page_token
+
+            try:
+                response = self.service.events().list(**params).execute()
+            except HttpError as e:
+                if e.resp.status == 410:
+                    raise SyncTokenExpired(str(e))
+                raise
+
+            items.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return items, response.get('nextSyncToken')
+
+    def _insert_request(self, event):
+        return self.service.events().insert(
+            calendarId=self.calendar_id,
+            body=build_event_body(event, 'create')
+        )
+
+    def _update_request(self, event):
+        return self.service.events().update(
+            calendarId=self.calendar_id,
+            eventId=event.google_event_id,
+            body=build_event_body(event, 'update')
+        )
+
+    def _delete_request(self, event):
+        return self.service.events().delete(
+            calendarId=self.calendar_id,
+            eventId=event.google_event_id
+        )
+
     def create_event(self, event):
         """
         Create a new event in Google Calendar.
@@ -75,32 +125,8 @@ class GoogleCalendarService:
         Returns:
             str: Google Calendar event ID
         """
-
-        sumary = ''
-        if event.lodge:
-            sumary = f'LOJA {event.lodge.name} - {event.title}'
-        else:
-            sumary = event.title
-
-        event_data = {
-            'summary': sumary,
-            'description': event.description,
-            'location': event.address,
-            'start': {
-                'dateTime': event.start_time.isoformat(),
-                'timeZone': 'America/Sao_Paulo',
-            },
-            'end': {
-                'dateTime': event.end_time.isoformat(),
-                'timeZone': 'America/Sao_Paulo',
-            },
-        }
-        
         try:
-            created_event = self.service.events().insert(
-                calendarId=self.calendar_id,
-                body=event_data
-            ).execute()
+            created_event = self._insert_request(event).execute()
             return created_event.get('id')
         except Exception as e:
             error_message = str(e)
@@ -112,34 +138,13 @@ class GoogleCalendarService:
         Update an existing event in Google Calendar.
         
         Args:
-            google_event_id (str): Google Calendar event ID
             event: Django Event model instance
             
         Returns:
             dict: Updated event data
         """
-        
-        event_data = {
-            'summary': f'Loja: {event.lodge.name} - {event.title}',
-            'description': event.description,
-            'location': event.address,
-            'start': {
-                'dateTime': event.start_time.isoformat(),
-                'timeZone': 'America/Sao_Paulo',
-            },
-            'end': {
-                'dateTime': event.end_time.isoformat(),
-                'timeZone': 'America/Sao_Paulo',
-            },
-        }
-        
         try:
-            updated_event = self.service.events().update(
-                calendarId=self.calendar_id,
-                eventId=event.google_event_id,
-                body=event_data
-            ).execute()
-            return updated_event
+            return self._update_request(event).execute()
         except Exception as e:
             error_message = str(e)
             self._send_error_notification(event, 'Atualização de Evento', error_message)
@@ -150,23 +155,149 @@ class GoogleCalendarService:
         Delete an event from Google Calendar.
         
         Args:
-            google_event_id (str): Google Calendar event ID
+            event: Django Event model instance
             
         Returns:
             bool: True if successful
         """
         try:
-            self.service.events().delete(
-                calendarId=self.calendar_id,
-                eventId=event.google_event_id
-            ).execute()
+            self._delete_request(event).execute()
             return True
         except Exception as e:
             error_message = str(e)
             self._send_error_notification(event, 'Exclusão de Evento', error_message)
             raise Exception(f"Failed to delete Google Calendar event: {error_message}")
 
+    def execute_batch(self, operations):
+        """
+        Run several writes through the Calendar batch endpoint.
+
+        Operations are sent in chunks of ``BATCH_SIZE`` per HTTP request.
+        Failures are reported per operation and, unlike the single-event
+        methods, do not email the admin: the caller decides what to do.
+
+        Args:
+            operations (list): ``(operation, event)`` tuples where operation
+                is ``'create'``, ``'update'`` or ``'delete'``
+
+        Returns:
+            list: ``(result, error)`` tuples in the same order as operations.
+                ``result`` is the Google event ID for creations and True for
+                the other operations; ``error`` is None on success.
+        """
+        builders = {
+            'create': self._insert_request,
+            'update': self._update_request,
+            'delete': self._delete_request,
+        }
+        results = [(None, None)] * len(operations)
+
+        for offset in range(0, len(operations), BATCH_SIZE):
+            chunk = operations[offset:offset + BATCH_SIZE]
+
+            def callback(request_id, response, exception, chunk=chunk, offset=offset):
+                index = offset + int(request_id)
+                operation = chunk[int(request_id)][0]
+                if exception is not None:
+                    results[index] = (None, exception)
+                elif operation == 'create':
+                    results[index] = (response.get('id'), None)
+                else:
+                    results[index] = (True, None)
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for position, (operation, event) in enumerate(chunk):
+                batch.add(builders[operation](event), request_id=str(position))
+
+            try:
+                batch.execute()
+            except Exception as e:
+                for position in range(len(chunk)):
+                    if results[offset + position] == (None, None):
+                        results[offset + position] = (None, e)
+
+        return results
+
+
+class _ServiceRegistry:
+    """
+    Per-process cache of the OAuth credentials and of the discovery client.
+
+    Credentials are shared by every thread and only refreshed once they
+    expire. The discovery client wraps an ``httplib2.Http`` that is not
+    thread-safe, so each thread keeps its own ``GoogleCalendarService``.
+    Both are rebuilt when ``token.json`` changes on disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._credentials = None
+        self._token_mtime = None
+
+    def _current_token_mtime(self):
+        try:
+            return os.stat(TOKEN_PATH).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get_credentials(self):
+        return self._load()[0]
+
+    def _load(self):
+        """Return the credentials, refreshed if needed, and the token.json mtime they came from."""
+        with self._lock:
+            token_mtime = self._current_token_mtime()
+            if self._credentials is None or token_mtime != self._token_mtime:
+                self._credentials = None
+                if token_mtime is not None:
+                    self._credentials = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+                self._token_mtime = token_mtime
+
+            creds = self._credentials
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    creds.refresh(google.auth.transport.requests.Request())
+                else:
+                    # Interactive consent is rare; keep oauthlib out of normal imports.
+                    from google_auth_oauthlib.flow import InstalledAppFlow
+
+                    flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
+                    creds = flow.run_local_server(port=8080, access_type='offline', prompt='consent')
+
+                with open(TOKEN_PATH, 'w') as token:
+                    token.write(creds.to_json())
+                self._credentials = creds
+                self._token_mtime = self._current_token_mtime()
+
+            return creds, self._token_mtime
+
+    def get_service(self):
+        # Refreshes the shared credentials if needed; a token.json replaced on
+        # disk changes its mtime and forces this thread to rebuild its client.
+        _creds, token_mtime = self._load()
+        service = getattr(self._local, 'service', None)
+        if service is None or self._local.token_mtime != token_mtime:
+            service = GoogleCalendarService()
+            self._local.service = service
+            self._local.token_mtime = token_mtime
+        return service
+
+    def clear(self):
+        with self._lock:
+            self._credentials = None
+            self._token_mtime = None
+        self._local = threading.local()
+
+
+_registry = _ServiceRegistry()
+
 
-# Helper function to get a calendar service instance
 def get_calendar_service():
-    return GoogleCalendarService()
+    """Return the calendar service cached for the current process and thread."""
+    return _registry.get_service()
+
+
+def reset_calendar_service():
+    """Drop the cached credentials and clients, e.g. after replacing token.json."""
+    _registry.clear()
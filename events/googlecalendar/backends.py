@@ -0,0 +1,130 @@
+"""
+Entry point to the calendar integration.
+
+Callers (the outbox worker, the calendar pull) get their service from
+``get_calendar_service()`` instead of importing ``actions``: that module
+pulls in ``googleapiclient``, ``google.oauth2`` and ``google.auth``, which
+are only loaded here, on first use, so web workers, migrations and
+management commands that never talk to Google do not pay for them.
+
+``settings.CALENDAR_BACKEND`` picks the implementation:
+
+- ``google``: the real Calendar API (``actions.GoogleCalendarService``)
+- ``memory``: ``offline.InMemoryCalendarService``, a per-process fake with
+  optional latency and failure injection, for CI and load runs
+- ``record``: the Google backend, with every call appended to
+  ``settings.CALENDAR_CASSETTE_PATH``
+- ``replay``: answers read back from that cassette, without network access
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Calendar API limit of calls per batch request.
+BATCH_SIZE = 50
+
+
+class SyncTokenExpired(Exception):
+    """Raised when Google rejects a sync token (HTTP 410) and a full sync is needed."""
+
+
+def build_event_body(event, operation):
+    """
+    Build the Google event resource sent for an ``Event``.
+
+    Args:
+        event: Django Event model instance
+        operation (str): ``'create'`` or ``'update'``; they use different
+            summary prefixes for lodge events
+
+    Returns:
+        dict: Event resource
+    """
+    if not event.lodge:
+        summary = event.title
+    elif operation == 'create':
+        summary = f'LOJA {event.lodge.name} - {event.title}'
+    else:
+        summary = f'Loja: {event.lodge.name} - {event.title}'
+
+    return {
+        'summary': summary,
+        'description': event.description,
+        'location': event.address,
+        'start': {
+            'dateTime': event.start_time.isoformat(),
+            'timeZone': 'America/Sao_Paulo',
+        },
+        'end': {
+            'dateTime': event.end_time.isoformat(),
+            'timeZone': 'America/Sao_Paulo',
+        },
+    }
+
+
+def _google_service():
+    from events.googlecalendar import actions
+
+    return actions.get_calendar_service()
+
+
+def _offline_service(name):
+    from events.googlecalendar import offline
+
+    latency = settings.CALENDAR_FAKE_LATENCY_MS / 1000
+    if name == 'memory':
+        return offline.InMemoryCalendarService(
+            latency=latency,
+            failure_rate=settings.CALENDAR_FAKE_FAILURE_RATE
+        )
+    if name == 'record':
+        return offline.RecordingCalendarService(_google_service, settings.CALENDAR_CASSETTE_PATH)
+    return offline.ReplayCalendarService(settings.CALENDAR_CASSETTE_PATH, latency=latency)
+
+
+BACKENDS = ('google', 'memory', 'record', 'replay')
+
+_lock = threading.Lock()
+_services = {}
+
+
+def get_calendar_service():
+    """
+    Return the calendar service selected by ``settings.CALENDAR_BACKEND``.
+
+    The Google client is cached per process and thread by ``actions``; the
+    offline backends keep one instance per process so the fake calendar, or
+    the position in the cassette, is shared by every caller.
+
+    Returns:
+        Object exposing ``execute_batch``, ``list_changes`` and ``calendar_id``
+
+    Raises:
+        ImproperlyConfigured: ``CALENDAR_BACKEND`` is not a known backend
+    """
+    name = settings.CALENDAR_BACKEND
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"CALENDAR_BACKEND must be one of {', '.join(BACKENDS)}, got {name!r}"
+        )
+    if name == 'google':
+        return _google_service()
+
+    with _lock:
+        if name not in _services:
+            _services[name] = _offline_service(name)
+        return _services[name]
+
+
+def reset_calendar_service():
+    """Drop cached services, credentials and clients, e.g. after replacing token.json."""
+    import sys
+
+    with _lock:
+        _services.clear()
+
+    actions = sys.modules.get('events.googlecalendar.actions')
+    if actions is not None:
+        actions.reset_calendar_service()
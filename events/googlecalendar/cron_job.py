@@ -12,40 +12,38 @@ logging.basicConfig(
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
-from events.googlecalendar.actions import get_calendar_service
-from setup.models import Setup
+from events.googlecalendar.sync import pull_changes
+from setup.models import get_setup
 from calendarrequest.utils import send_email_notification
 
 logger = logging.getLogger(__name__)
 
 
-def check_last_event():
+def sync_calendar_changes():
     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     logger.info("="*50)
     logger.info(f"Starting cron job check at {current_time}")
     logger.info("="*50)
     
     try:
-        calendar_service = get_calendar_service()
-        last_event = calendar_service.get_last_event()
-        
-        if last_event:
-            logger.info(f"Last event found: {last_event.get('summary')}")
-            logger.info(f"Event details: Start: {last_event.get('start', {}).get('dateTime')}")
-        else:
-            logger.info("No events found in the calendar")
-            
+        stats = pull_changes()
+        logger.info(
+            f"Google Calendar changes applied: {stats['updated']} updated, "
+            f"{stats['cancelled']} cancelled, {stats['ignored']} ignored, "
+            f"{stats['skipped']} skipped with pending local changes"
+        )
+
     except Exception as e:
-        logger.error(f"Error checking last event: {str(e)}")
-        setup = Setup.objects.last()
+        logger.error(f"Error syncing calendar changes: {str(e)}")
+        setup = get_setup()
         if setup and setup.admin_email:
             try:
                 send_email_notification(
-                    subject='Error checking last event',
+                    subject='Error syncing calendar changes',
                     template_name='email/google_calendar_error.html',
                     context={
                         'error_message': str(e),
-                        'operation': 'Last event check'
+                        'operation': 'Calendar changes sync'
                     },
                     recipient_list=[setup.admin_email]
                 )
@@ -57,4 +55,4 @@ def check_last_event():
     logger.info("="*50 + "\n")
 
 if __name__ == '__main__':
-    check_last_event()
+    sync_calendar_changes()
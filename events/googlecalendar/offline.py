@@ -0,0 +1,222 @@
+"""
+Calendar backends that work without Google: an in-memory calendar and a
+record/replay pair. See ``backends`` for how they are selected.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+from .backends import BATCH_SIZE, SyncTokenExpired, build_event_body
+
+
+class InMemoryCalendarService:
+    """
+    Calendar kept in a dict, with the same interface as ``GoogleCalendarService``.
+
+    Writes are grouped in HTTP round trips of ``BATCH_SIZE`` like the Calendar
+    batch endpoint, and every round trip sleeps ``latency`` seconds. Deleted
+    events stay listed with ``status == 'cancelled'`` and ``list_changes``
+    hands out sync tokens, so the calendar pull can be exercised too.
+    """
+
+    calendar_id = 'memory'
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        """
+        Args:
+            latency (float): Seconds added to every API request
+            failure_rate (float): Share of writes, from 0 to 1, that fail
+            seed (int): Seed for the failure injection
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.events = {}
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._changes = []
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _write(self, operation, event):
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise ConnectionError(f'Injected failure on {operation} of event {event.pk}')
+
+        if operation == 'create':
+            google_id = f'memory-{next(self._ids)}'
+        else:
+            google_id = event.google_event_id
+            if google_id not in self.events or self.events[google_id]['status'] == 'cancelled':
+                raise LookupError(f'Google event {google_id} not found')
+
+        if operation == 'delete':
+            resource = {**self.events[google_id], 'status': 'cancelled'}
+        else:
+            resource = {**build_event_body(event, operation), 'id': google_id, 'status': 'confirmed'}
+
+        self.events[google_id] = resource
+        self._changes.append(google_id)
+        return google_id if operation == 'create' else True
+
+    def execute_batch(self, operations):
+        """
+        Apply writes in round trips of ``BATCH_SIZE``.
+
+        Args:
+            operations (list): ``(operation, event)`` tuples
+
+        Returns:
+            list: ``(result, error)`` tuples, as ``GoogleCalendarService.execute_batch``
+        """
+        results = []
+        for offset in range(0, len(operations), BATCH_SIZE):
+            self._round_trip()
+            with self._lock:
+                for operation, event in operations[offset:offset + BATCH_SIZE]:
+                    try:
+                        results.append((self._write(operation, event), None))
+                    except Exception as e:
+                        results.append((None, e))
+        return results
+
+    def list_changes(self, sync_token=None):
+        """
+        List the events changed since ``sync_token``, or every live event without one.
+
+        Returns:
+            tuple: (list of event resources, next sync token)
+
+        Raises:
+            SyncTokenExpired: The token was not issued by this calendar
+        """
+        self._round_trip()
+        with self._lock:
+            if sync_token is None:
+                items = [item for item in self.events.values() if item['status'] != 'cancelled']
+            else:
+                try:
+                    position = int(sync_token)
+                except ValueError:
+                    raise SyncTokenExpired(f'Unknown sync token {sync_token!r}')
+                if not 0 <= position <= len(self._changes):
+                    raise SyncTokenExpired(f'Unknown sync token {sync_token!r}')
+                changed = dict.fromkeys(self._changes[position:])
+                items = [self.events[google_id] for google_id in changed]
+            return [dict(item) for item in items], str(len(self._changes))
+
+
+class RecordingCalendarService:
+    """
+    Forward calls to another calendar service and append them to a cassette.
+
+    The cassette is a JSON Lines file with one entry per call; errors are
+    stored as their message. ``ReplayCalendarService`` plays it back.
+    """
+
+    def __init__(self, get_service, path):
+        """
+        Args:
+            get_service (callable): Returns the service to forward to; called
+                on every request so per-thread Google clients keep working
+            path (str): Cassette file, appended to
+        """
+        self.get_service = get_service
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def calendar_id(self):
+        return self.get_service().calendar_id
+
+    def _record(self, entry):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as cassette:
+            cassette.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def execute_batch(self, operations):
+        results = self.get_service().execute_batch(operations)
+        self._record({
+            'call': 'execute_batch',
+            'operations': [operation for operation, _ in operations],
+            'results': [
+                [result, None if error is None else str(error)]
+                for result, error in results
+            ],
+        })
+        return results
+
+    def list_changes(self, sync_token=None):
+        try:
+            items, next_token = self.get_service().list_changes(sync_token)
+        except SyncTokenExpired as e:
+            self._record({'call': 'list_changes', 'sync_token': sync_token, 'expired': str(e)})
+            raise
+        self._record({
+            'call': 'list_changes',
+            'sync_token': sync_token,
+            'items': items,
+            'next_sync_token': next_token,
+        })
+        return items, next_token
+
+
+class CassetteMismatch(Exception):
+    """Raised when a replayed call does not match the next recorded one."""
+
+
+class ReplayCalendarService:
+    """
+    Answer calls from a cassette written by ``RecordingCalendarService``.
+
+    Each kind of call is replayed in recording order; a batch must ask for
+    the same sequence of operations that was recorded.
+    """
+
+    calendar_id = 'replay'
+
+    def __init__(self, path, latency=0.0):
+        """
+        Args:
+            path (str): Cassette file
+            latency (float): Seconds added to every replayed request
+        """
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = defaultdict(deque)
+        with open(path, encoding='utf-8') as cassette:
+            for line in cassette:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry['call']].append(entry)
+
+    def _next(self, call):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if not self._entries[call]:
+                raise CassetteMismatch(f'No recorded {call} call left in the cassette')
+            return self._entries[call].popleft()
+
+    def execute_batch(self, operations):
+        entry = self._next('execute_batch')
+        requested = [operation for operation, _ in operations]
+        if requested != entry['operations']:
+            raise CassetteMismatch(f"Expected operations {entry['operations']}, got {requested}")
+        return [
+            (result, None if error is None else Exception(error))
+            for result, error in entry['results']
+        ]
+
+    def list_changes(self, sync_token=None):
+        entry = self._next('list_changes')
+        if 'expired' in entry:
+            raise SyncTokenExpired(entry['expired'])
+        return entry['items'], entry['next_sync_token']
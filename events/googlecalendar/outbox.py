@@ -0,0 +1,260 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from setup.models import get_setup
+from calendarrequest.utils import send_email_notification
+from events.models import Event, CalendarSyncOperation
+from events.googlecalendar.backends import get_calendar_service
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+CLAIM_SIZE = 50
+RETRY_BASE_DELAY = timedelta(minutes=1)
+
+
+def process_pending(calendar_service=None, limit=100):
+    """
+    Drain the Google Calendar sync outbox.
+
+    Operations are claimed in groups of ``CLAIM_SIZE`` and sent to Google
+    with a single batch request per group. No transaction or row lock is
+    held during the request: the claim is committed first, counting the
+    attempt and pushing ``next_attempt_at`` back by the retry delay, and
+    the results are saved afterwards in a second short transaction. If the
+    run dies in between, the operations are retried after that delay.
+
+    Args:
+        calendar_service: Object exposing ``execute_batch``. Defaults to
+            ``get_calendar_service()`` and is only built when there is work
+            to do, so tests can pass a fake.
+        limit (int): Maximum number of operations handled in this run
+
+    Returns:
+        dict: Number of operations per resulting status
+    """
+    results = {CalendarSyncOperation.DONE: 0, CalendarSyncOperation.PENDING: 0, CalendarSyncOperation.FAILED: 0}
+    processed = 0
+
+    while processed < limit:
+        operations, events, calls = _claim_group(min(CLAIM_SIZE, limit - processed))
+        if not operations:
+            break
+
+        unavailable = False
+        if calls:
+            try:
+                if calendar_service is None:
+                    calendar_service = get_calendar_service()
+                responses = calendar_service.execute_batch(
+                    [(call, events[operation.event_id]) for operation, call in calls]
+                )
+            except Exception as e:
+                # Google (or the credentials) is unavailable: every call failed.
+                unavailable = True
+                responses = [(None, e)] * len(calls)
+
+            for operation, event in _save_results(calls, responses, events):
+                _send_user_notification(operation, event)
+
+        for operation in operations:
+            results[operation.status] += 1
+        processed += len(operations)
+        if unavailable:
+            break
+
+    return results
+
+
+def _claim_group(size):
+    """
+    Claim the next operations and commit the claim.
+
+    Operations that need no Google call are marked done here. The others
+    get their attempt counted and ``next_attempt_at`` set to the retry
+    time, so no other run picks them up while the batch is in flight.
+    Operations whose earlier attempts never had their result saved give up
+    after ``MAX_ATTEMPTS``.
+
+    Returns:
+        tuple: (claimed operations, events by pk, (operation, call) pairs to send)
+    """
+    with transaction.atomic():
+        operations = _claim(size)
+        events = Event.objects.select_related('lodge', 'user').in_bulk(
+            [operation.event_id for operation in operations]
+        )
+        calls = []
+        for operation in operations:
+            event = events[operation.event_id]
+            call = _google_call(operation, event)
+            if call is None:
+                operation.attempts += 1
+                _mark_done(operation)
+            elif operation.attempts >= MAX_ATTEMPTS:
+                _mark_failed_attempt(operation, event, 'The result of the last attempt was not recorded')
+            else:
+                operation.attempts += 1
+                operation.next_attempt_at = timezone.now() + _retry_delay(operation)
+                operation.save(update_fields=['attempts', 'next_attempt_at', 'updated_at'])
+                calls.append((operation, call))
+    return operations, events, calls
+
+
+def _save_results(calls, responses, events):
+    """
+    Save the batch responses in one transaction.
+
+    An event edited while its create or update was in flight was saved with
+    that operation still pending, so ``event_post_save`` queued nothing; a
+    follow-up update is queued here instead. The event rows are locked first
+    so an edit committing meanwhile is either seen here or queues its own.
+
+    Returns:
+        list: (operation, event) pairs whose user should be notified
+    """
+    notifications = []
+    with transaction.atomic():
+        current = {
+            pk: (updated_at, is_cancelled)
+            for pk, updated_at, is_cancelled in Event.objects.select_for_update()
+            .filter(pk__in=[operation.event_id for operation, _call in calls])
+            .values_list('pk', 'updated_at', 'is_cancelled')
+        }
+        for (operation, call), (response, error) in zip(calls, responses):
+            event = events[operation.event_id]
+            if error is not None:
+                _mark_failed_attempt(operation, event, error)
+                continue
+            if call == CalendarSyncOperation.CREATE:
+                Event.objects.filter(pk=event.pk).update(google_event_id=response)
+                event.google_event_id = response
+            _mark_done(operation)
+            if operation.notify:
+                notifications.append((operation, event))
+
+            updated_at, is_cancelled = current.get(event.pk, (event.updated_at, True))
+            if call != CalendarSyncOperation.DELETE and updated_at != event.updated_at and not is_cancelled:
+                _queue_follow_up_update(event)
+    return notifications
+
+
+def _queue_follow_up_update(event):
+    pending = CalendarSyncOperation.objects.filter(
+        event=event, operation=CalendarSyncOperation.UPDATE, status=CalendarSyncOperation.PENDING
+    )
+    if not pending.exists():
+        CalendarSyncOperation.objects.create(event=event, operation=CalendarSyncOperation.UPDATE)
+        logger.debug("Event %s changed while being synced, queued a Google Calendar update", event.pk)
+
+
+def _claim(size):
+    """
+    Lock the next pending operations.
+
+    An operation waits while an older one of the same event is still
+    pending, even if that one is claimed by another run or waiting for a
+    retry, so that e.g. a delete never runs before its create.
+    """
+    older_pending = CalendarSyncOperation.objects.filter(
+        event=OuterRef('event'),
+        status=CalendarSyncOperation.PENDING,
+        id__lt=OuterRef('id')
+    )
+    return list(
+        CalendarSyncOperation.objects
+        .select_for_update(skip_locked=True)
+        .filter(status=CalendarSyncOperation.PENDING, next_attempt_at__lte=timezone.now())
+        .exclude(Exists(older_pending))
+        .order_by('id')[:size]
+    )
+
+
+def _google_call(operation, event):
+    """
+    Return the calendar operation to run for an outbox row, or None when the
+    row is already satisfied (event created, cancelled or never synced).
+    """
+    if operation.operation == CalendarSyncOperation.CREATE:
+        if event.google_event_id or event.is_cancelled:
+            return None
+        return CalendarSyncOperation.CREATE
+
+    if not event.google_event_id:
+        return None
+
+    if operation.operation == CalendarSyncOperation.UPDATE and event.is_cancelled:
+        return None
+
+    return operation.operation
+
+
+def _mark_done(operation):
+    operation.status = CalendarSyncOperation.DONE
+    operation.last_error = ''
+    operation.save(update_fields=['attempts', 'status', 'last_error', 'updated_at'])
+
+
+def _retry_delay(operation):
+    return RETRY_BASE_DELAY * (2 ** (operation.attempts - 1))
+
+
+def _mark_failed_attempt(operation, event, error):
+    operation.last_error = str(error)
+    if operation.attempts >= MAX_ATTEMPTS:
+        operation.status = CalendarSyncOperation.FAILED
+        logger.error(
+            "Giving up on Google Calendar %s after %s attempts: %s",
+            operation.operation,
+            operation.attempts,
+            str(error),
+            extra={'event_id': event.pk, 'event_title': event.title}
+        )
+    else:
+        operation.next_attempt_at = timezone.now() + _retry_delay(operation)
+        logger.warning(
+            "Google Calendar %s failed (attempt %s), retrying at %s: %s",
+            operation.operation,
+            operation.attempts,
+            operation.next_attempt_at,
+            str(error),
+            extra={'event_id': event.pk, 'event_title': event.title}
+        )
+    operation.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error', 'updated_at'])
+
+
+def _send_user_notification(operation, event):
+    try:
+        if operation.operation == CalendarSyncOperation.CREATE:
+            setup = get_setup()
+            send_email_notification(
+                subject='Evento Criado com Sucesso',
+                template_name='email/event_created_notification.html',
+                context={
+                    'event': event,
+                    'calendar_url': setup.calendar_url if setup else 'https://calendar.google.com/calendar'
+                },
+                recipient_list=[event.user.email]
+            )
+        elif operation.operation == CalendarSyncOperation.DELETE:
+            send_email_notification(
+                subject='Evento Cancelado',
+                template_name='email/event_cancelled_notification.html',
+                context={'event': event},
+                recipient_list=[event.user.email]
+            )
+    except Exception as email_error:
+        logger.error(
+            "Error sending event %s notification email: %s",
+            operation.operation,
+            str(email_error),
+            extra={
+                'event_id': event.pk,
+                'event_title': event.title,
+                'user_email': event.user.email
+            }
+        )
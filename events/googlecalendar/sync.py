@@ -0,0 +1,144 @@
+import logging
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from events.models import Event, CalendarSyncOperation, CalendarSyncState
+from events.googlecalendar.backends import SyncTokenExpired, get_calendar_service
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK_SIZE = 500
+
+
+def pull_changes(calendar_service=None):
+    """
+    Bring changes made directly in Google Calendar back into ``Event``.
+
+    Uses the stored sync token so each run only lists the events changed
+    since the previous one; falls back to a full listing when there is no
+    token yet or Google expired it.
+
+    Args:
+        calendar_service: Object exposing ``list_changes`` and
+            ``calendar_id``. Defaults to ``get_calendar_service()``.
+
+    Returns:
+        dict: Number of events updated, cancelled, ignored and skipped
+    """
+    if calendar_service is None:
+        calendar_service = get_calendar_service()
+
+    state, _ = CalendarSyncState.objects.get_or_create(calendar_id=calendar_service.calendar_id)
+
+    try:
+        items, sync_token = calendar_service.list_changes(state.sync_token)
+    except SyncTokenExpired:
+        logger.warning("Google Calendar sync token expired, running a full sync")
+        items, sync_token = calendar_service.list_changes(None)
+
+    stats = apply_changes(items)
+
+    state.sync_token = sync_token
+    state.last_synced_at = timezone.now()
+    state.save(update_fields=['sync_token', 'last_synced_at', 'updated_at'])
+
+    return stats
+
+
+def apply_changes(items):
+    """
+    Apply Google event resources to the matching ``Event`` rows.
+
+    Rows are written with ``QuerySet.update()`` so ``event_post_save`` does
+    not queue the same change back to Google. Events that were not created
+    by this system are ignored. Events with a pending outbox operation are
+    skipped: they were edited here since Google's copy was written, and the
+    outbox is about to send that edit.
+
+    Args:
+        items (list): Google Calendar event resources
+
+    Returns:
+        dict: Number of events updated, cancelled, ignored and skipped
+    """
+    stats = {'updated': 0, 'cancelled': 0, 'ignored': 0, 'skipped': 0}
+    google_ids = [item['id'] for item in items]
+    events = {}
+    for offset in range(0, len(google_ids), LOOKUP_CHUNK_SIZE):
+        chunk = google_ids[offset:offset + LOOKUP_CHUNK_SIZE]
+        rows = Event.objects.select_related('lodge').filter(google_event_id__in=chunk).annotate(
+            has_pending_sync=Exists(CalendarSyncOperation.objects.filter(
+                event=OuterRef('pk'), status=CalendarSyncOperation.PENDING
+            ))
+        )
+        for event in rows:
+            events[event.google_event_id] = event
+
+    now = timezone.now()
+    for item in items:
+        event = events.get(item['id'])
+        if event is None:
+            stats['ignored'] += 1
+            continue
+        if event.has_pending_sync:
+            stats['skipped'] += 1
+            logger.info(
+                "Event %s has a pending Google Calendar sync, keeping the local copy",
+                event.pk,
+                extra={'event_id': event.pk, 'google_event_id': event.google_event_id}
+            )
+            continue
+
+        if item.get('status') == 'cancelled':
+            if not event.is_cancelled:
+                Event.objects.filter(pk=event.pk).update(is_cancelled=True, updated_at=now)
+                stats['cancelled'] += 1
+            continue
+
+        changes = _changed_fields(event, item)
+        if changes:
+            Event.objects.filter(pk=event.pk).update(updated_at=now, **changes)
+            stats['updated'] += 1
+            logger.info(
+                "Event %s updated from Google Calendar: %s",
+                event.pk,
+                ', '.join(changes),
+                extra={'event_id': event.pk, 'google_event_id': event.google_event_id}
+            )
+
+    return stats
+
+
+def _changed_fields(event, item):
+    values = {
+        'description': item.get('description') or '',
+        'address': item.get('location') or '',
+    }
+
+    title = _title_from_summary(event, item.get('summary') or '')
+    if title:
+        values['title'] = title
+
+    # All-day events only carry a 'date'; keep our times in that case.
+    start = parse_datetime(item.get('start', {}).get('dateTime') or '')
+    end = parse_datetime(item.get('end', {}).get('dateTime') or '')
+    if start and end:
+        values['start_time'] = start
+        values['end_time'] = end
+
+    return {
+        field: value
+        for field, value in values.items()
+        if value != getattr(event, field)
+    }
+
+
+def _title_from_summary(event, summary):
+    """Strip the lodge prefix added by ``GoogleCalendarService`` from a summary."""
+    if event.lodge:
+        for prefix in (f'LOJA {event.lodge.name} - ', f'Loja: {event.lodge.name} - '):
+            if summary.startswith(prefix):
+                return summary[len(prefix):]
+    return summary
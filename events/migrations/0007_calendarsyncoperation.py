@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_lodge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncOperation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('operation', models.CharField(choices=[('create', 'Criação'), ('update', 'Atualização'), ('delete', 'Exclusão')], max_length=10, verbose_name='Operação')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('done', 'Concluída'), ('failed', 'Falhou')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima tentativa')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último erro')),
+                ('notify', models.BooleanField(default=True, help_text='Envia o email de criação/cancelamento ao usuário após a sincronização.', verbose_name='Notificar usuário')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_operations', to='events.event', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Sincronização com o Google Calendar',
+                'verbose_name_plural': 'Sincronizações com o Google Calendar',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='events_sync_status_next_idx')],
+            },
+        ),
+    ]
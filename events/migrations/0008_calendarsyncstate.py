@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:12
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_calendarsyncoperation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('calendar_id', models.CharField(max_length=255, unique=True, verbose_name='ID do calendário')),
+                ('sync_token', models.TextField(blank=True, null=True, verbose_name='Token de sincronização')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Última sincronização')),
+            ],
+            options={
+                'verbose_name': 'Estado da sincronização do Google Calendar',
+                'verbose_name_plural': 'Estados da sincronização do Google Calendar',
+            },
+        ),
+    ]
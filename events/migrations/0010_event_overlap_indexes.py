@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+SPAN_INDEX = 'events_span_gist_idx'
+
+
+def create_span_index(apps, schema_editor):
+    # GiST indexes on ranges only exist on PostgreSQL; other backends use the
+    # (lodge, end_time) / (address, end_time) indexes above.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {SPAN_INDEX} ON events_event "
+        "USING gist (tstzrange(start_time, GREATEST(start_time, end_time), '[)')) "
+        "WHERE NOT is_cancelled"
+    )
+
+
+def drop_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SPAN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_cancelled', False)), fields=['lodge', 'end_time'], name='events_lodge_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_cancelled', False)), fields=['address', 'end_time'], name='events_address_end_idx'),
+        ),
+        migrations.RunPython(create_span_index, drop_span_index),
+    ]
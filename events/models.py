@@ -3,14 +3,11 @@ import logging
 from django.db import models
 from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_delete
-from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
 
-from setup.models import Setup
 from lodge.models import Lodge
 from core.behaviours.trackable import Trackable
-from calendarrequest.utils import send_email_notification
-from events.googlecalendar.actions import get_calendar_service
 
 logger = logging.getLogger(__name__)
 
@@ -48,84 +45,136 @@ class Event(Trackable):
     class Meta:
         verbose_name = 'Evento'
         verbose_name_plural = 'Eventos'
+        indexes = [
+            # Non-superusers only ever see their own events in the admin.
+            models.Index(fields=['user', 'start_time'], name='events_user_start_idx'),
+            models.Index(fields=['lodge', 'start_time'], name='events_lodge_start_idx'),
+            # Upcoming-event listings skip cancelled rows, which only grow.
+            models.Index(
+                fields=['start_time'],
+                name='events_active_start_idx',
+                condition=models.Q(is_cancelled=False)
+            ),
+            # Calendar pulls match Google changes back to events by this id.
+            models.Index(fields=['google_event_id'], name='events_google_id_idx'),
+            # Overlap checks (events.conflicts): active events at a lodge or
+            # address that end after a given moment. PostgreSQL also gets a
+            # GiST range index, created in migration 0010.
+            models.Index(
+                fields=['lodge', 'end_time'],
+                name='events_lodge_end_idx',
+                condition=models.Q(is_cancelled=False)
+            ),
+            models.Index(
+                fields=['address', 'end_time'],
+                name='events_address_end_idx',
+                condition=models.Q(is_cancelled=False)
+            ),
+        ]
+
+
+class CalendarSyncOperation(Trackable):
+    """
+    Pending Google Calendar write recorded by the Event signals and drained
+    by the ``process_calendar_outbox`` management command.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    OPERATION_CHOICES = (
+        (CREATE, 'Criação'),
+        (UPDATE, 'Atualização'),
+        (DELETE, 'Exclusão'),
+    )
+
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pendente'),
+        (DONE, 'Concluída'),
+        (FAILED, 'Falhou'),
+    )
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='sync_operations',
+        verbose_name='Evento'
+    )
+    operation = models.CharField('Operação', max_length=10, choices=OPERATION_CHOICES)
+    status = models.CharField('Status', max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Tentativas', default=0)
+    next_attempt_at = models.DateTimeField('Próxima tentativa', default=timezone.now)
+    last_error = models.TextField('Último erro', blank=True)
+    notify = models.BooleanField(
+        'Notificar usuário',
+        default=True,
+        help_text='Envia o email de criação/cancelamento ao usuário após a sincronização.'
+    )
+
+    def __str__(self):
+        return f"{self.get_operation_display()} - {self.event_id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Sincronização com o Google Calendar'
+        verbose_name_plural = 'Sincronizações com o Google Calendar'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='events_sync_status_next_idx'),
+        ]
+
+
+class CalendarSyncState(Trackable):
+    """
+    Google Calendar ``nextSyncToken`` kept between incremental pulls.
+    """
+    calendar_id = models.CharField('ID do calendário', max_length=255, unique=True)
+    sync_token = models.TextField('Token de sincronização', blank=True, null=True)
+    last_synced_at = models.DateTimeField('Última sincronização', blank=True, null=True)
+
+    def __str__(self):
+        return self.calendar_id
+
+    class Meta:
+        verbose_name = 'Estado da sincronização do Google Calendar'
+        verbose_name_plural = 'Estados da sincronização do Google Calendar'
 
 
 @receiver(post_save, sender=Event)
 def event_post_save(sender, instance, created, **kwargs):
-    try:
-        calendar_service = get_calendar_service()
-        setup = Setup.objects.last()
-        
-        if created:
-            google_event_id = calendar_service.create_event(instance)
-            Event.objects.filter(pk=instance.pk).update(
-                google_event_id=google_event_id
-            )
-            
-            # Send notification email to user
-            try:
-                send_email_notification(
-                    subject='Evento Criado com Sucesso',
-                    template_name='email/event_created_notification.html',
-                    context={
-                        'event': instance,
-                        'calendar_url': setup.calendar_url if setup else 'https://calendar.google.com/calendar'
-                    },
-                    recipient_list=[instance.user.email]
-                )
-            except Exception as email_error:
-                logger.error(
-                    "Error sending event creation notification email: %s",
-                    str(email_error),
-                    extra={
-                        'event_id': instance.pk,
-                        'event_title': instance.title,
-                        'user_email': instance.user.email
-                    }
-                )
-        else:
-            if instance.is_cancelled:
-                try:
-                    calendar_service.delete_event(instance)
-                    
-                    # Send cancellation notification email to user
-                    try:
-                        send_email_notification(
-                            subject='Evento Cancelado',
-                            template_name='email/event_cancelled_notification.html',
-                            context={'event': instance},
-                            recipient_list=[instance.user.email]
-                        )
-                    except Exception as email_error:
-                        logger.error(
-                            "Error sending event cancellation notification email: %s",
-                            str(email_error),
-                            extra={
-                                'event_id': instance.pk,
-                                'event_title': instance.title,
-                                'user_email': instance.user.email
-                            }
-                        )
-                except Exception as e:
-                    logger.error(
-                        "Error deleting existing event from Google Calendar during update: %s",
-                        str(e),
-                        extra={
-                            'event_id': instance.pk,
-                            'event_title': instance.title,
-                            'google_event_id': instance.google_event_id
-                        }
-                    )
-            else:
-                if instance.google_event_id:
-                    calendar_service.update_event(instance)
-    except Exception as e:
-        logger.error(
-            "Error syncing event with Google Calendar: %s",
-            str(e),
-            extra={
-                'event_id': instance.pk,
-                'event_title': instance.title,
-                'is_new_event': created
-            }
-        )
+    """
+    Record the Google Calendar write in the sync outbox.
+
+    The row is written in the same transaction as the event, so the admin
+    save never waits on Google; ``process_calendar_outbox`` performs the
+    actual API call and sends the user notification.
+    """
+    pending = CalendarSyncOperation.objects.filter(
+        event=instance,
+        status=CalendarSyncOperation.PENDING
+    )
+
+    if created:
+        operation = CalendarSyncOperation.CREATE
+    elif instance.is_cancelled:
+        already_queued = CalendarSyncOperation.objects.filter(
+            event=instance,
+            operation=CalendarSyncOperation.DELETE
+        ).exclude(status=CalendarSyncOperation.FAILED).exists()
+        if already_queued:
+            return
+        operation = CalendarSyncOperation.DELETE
+    else:
+        # A pending creation already reads the latest row, and an event that
+        # was never created in Google has nothing to update.
+        if not instance.google_event_id:
+            return
+        if pending.filter(operation=CalendarSyncOperation.UPDATE).exists():
+            return
+        operation = CalendarSyncOperation.UPDATE
+
+    CalendarSyncOperation.objects.create(event=instance, operation=operation)
+    logger.debug(
+        "Queued Google Calendar %s for event %s", operation, instance.pk
+    )
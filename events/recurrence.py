@@ -0,0 +1,230 @@
+import calendar
+import logging
+import re
+from datetime import date, datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from setup.models import get_setup
+from calendarrequest.utils import send_email_notification
+from events.models import Event, CalendarSyncOperation
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_OCCURRENCES = 500
+
+_BYDAY_RE = re.compile(r'^([+-]?[1-5])?(MO|TU|WE|TH|FR|SA|SU)$')
+
+
+def parse_rule(rule):
+    """
+    Parse the subset of RFC 5545 RRULE used for lodge sessions.
+
+    Supported parts: ``FREQ`` (WEEKLY or MONTHLY), ``INTERVAL``, ``BYDAY``
+    (with ordinals such as ``2TU`` or ``-1FR`` for MONTHLY), ``COUNT`` and
+    ``UNTIL`` (``YYYYMMDD``). Example: ``FREQ=MONTHLY;BYDAY=2TU,4TU``.
+
+    Returns:
+        dict: freq, interval, byday (list of (ordinal, weekday)), count, until
+
+    Raises:
+        ValidationError: The rule is malformed or uses unsupported parts
+    """
+    parts = {}
+    for part in rule.upper().replace('RRULE:', '').strip().strip(';').split(';'):
+        if '=' not in part:
+            raise ValidationError(f'Regra inválida: "{part}".')
+        key, value = part.split('=', 1)
+        parts[key.strip()] = value.strip()
+
+    unsupported = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'COUNT', 'UNTIL'}
+    if unsupported:
+        raise ValidationError(f'Parâmetros não suportados: {", ".join(sorted(unsupported))}.')
+
+    freq = parts.get('FREQ')
+    if freq not in ('WEEKLY', 'MONTHLY'):
+        raise ValidationError('FREQ deve ser WEEKLY ou MONTHLY.')
+
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+        until = datetime.strptime(parts['UNTIL'][:8], '%Y%m%d').date() if 'UNTIL' in parts else None
+    except ValueError:
+        raise ValidationError('INTERVAL, COUNT ou UNTIL inválido.')
+    if interval < 1 or (count is not None and count < 1):
+        raise ValidationError('INTERVAL e COUNT devem ser maiores que zero.')
+
+    byday = []
+    for token in filter(None, parts.get('BYDAY', '').split(',')):
+        match = _BYDAY_RE.match(token.strip())
+        if not match:
+            raise ValidationError(f'BYDAY inválido: "{token}".')
+        ordinal = int(match.group(1)) if match.group(1) else None
+        if ordinal is not None and freq == 'WEEKLY':
+            raise ValidationError('Ordinais em BYDAY só são permitidos com FREQ=MONTHLY.')
+        byday.append((ordinal, WEEKDAYS.index(match.group(2))))
+
+    return {'freq': freq, 'interval': interval, 'byday': byday, 'count': count, 'until': until}
+
+
+def expand_rule(rule, start_date, end_date):
+    """
+    List the dates matched by ``rule`` between ``start_date`` and ``end_date``.
+
+    Args:
+        rule (str|dict): RRULE-like string or the result of ``parse_rule``
+        start_date (date): First day considered; also anchors INTERVAL
+        end_date (date): Last day considered (UNTIL may end earlier)
+
+    Returns:
+        list: Sorted ``date`` objects, at most ``MAX_OCCURRENCES``
+    """
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+
+    last_day = min(end_date, rule['until']) if rule['until'] else end_date
+    dates = []
+
+    if rule['freq'] == 'WEEKLY':
+        byday = rule['byday'] or [(None, start_date.weekday())]
+        week_start = start_date - timedelta(days=start_date.weekday())
+        while week_start <= last_day:
+            for _, weekday in sorted(byday, key=lambda item: item[1]):
+                dates.append(week_start + timedelta(days=weekday))
+            week_start += timedelta(weeks=rule['interval'])
+    else:
+        year, month = start_date.year, start_date.month
+        while date(year, month, 1) <= last_day:
+            month_dates = set()
+            for ordinal, weekday in rule['byday']:
+                month_dates.update(_weekdays_in_month(year, month, weekday, ordinal))
+            # Without BYDAY, RFC 5545 repeats on the day of the month of the
+            # start date; months without that day (e.g. the 31st) are skipped.
+            if not rule['byday'] and start_date.day <= calendar.monthrange(year, month)[1]:
+                month_dates.add(date(year, month, start_date.day))
+            dates.extend(sorted(month_dates))
+            month += rule['interval']
+            year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+
+    dates = [day for day in dates if start_date <= day <= last_day]
+    if rule['count'] is not None:
+        dates = dates[:rule['count']]
+    return dates[:MAX_OCCURRENCES]
+
+
+def _weekdays_in_month(year, month, weekday, ordinal=None):
+    days_in_month = calendar.monthrange(year, month)[1]
+    matches = [
+        date(year, month, day)
+        for day in range(1, days_in_month + 1)
+        if date(year, month, day).weekday() == weekday
+    ]
+    if ordinal is None:
+        return matches
+    index = ordinal - 1 if ordinal > 0 else ordinal
+    try:
+        return [matches[index]]
+    except IndexError:
+        return []
+
+
+def build_recurring_events(user, lodges, title, description, address, start_time, end_time, rule,
+                           start_date, end_date):
+    """
+    Build (without saving) every occurrence of a recurring session for each lodge.
+
+    Takes the same arguments as ``create_recurring_events``.
+
+    Returns:
+        list: Unsaved Event instances
+    """
+    dates = expand_rule(rule, start_date, end_date)
+    return [
+        Event(
+            user=user,
+            lodge=lodge,
+            title=title,
+            description=description,
+            address=address,
+            start_time=timezone.make_aware(datetime.combine(day, start_time)),
+            end_time=timezone.make_aware(datetime.combine(day, end_time)),
+        )
+        for lodge in lodges
+        for day in dates
+    ]
+
+
+def create_recurring_events(user, lodges, title, description, address, start_time, end_time, rule,
+                            start_date, end_date):
+    """
+    Create every occurrence of a recurring session for each lodge at once.
+
+    Events are inserted with ``bulk_create`` (so ``event_post_save`` does not
+    run per row), their Google Calendar creations are queued in the outbox
+    without per-event emails, and a single summary email goes to ``user``.
+    Scheduling conflicts are not checked here; see
+    ``events.conflicts.find_batch_conflicts``.
+
+    Args:
+        user: Owner of the created events
+        lodges: Iterable of Lodge instances
+        title (str): Event title
+        description (str): Event description
+        address (str): Event address
+        start_time (time): Local start time of each session
+        end_time (time): Local end time of each session
+        rule (str): RRULE-like pattern, see ``parse_rule``
+        start_date (date): First day of the period
+        end_date (date): Last day of the period
+
+    Returns:
+        list: Created Event instances
+    """
+    events = build_recurring_events(
+        user, lodges, title, description, address, start_time, end_time, rule, start_date, end_date
+    )
+
+    with transaction.atomic():
+        Event.objects.bulk_create(events, batch_size=500)
+        CalendarSyncOperation.objects.bulk_create(
+            [
+                CalendarSyncOperation(event=event, operation=CalendarSyncOperation.CREATE, notify=False)
+                for event in events
+            ],
+            batch_size=500
+        )
+        transaction.on_commit(lambda: _send_summary_notification(user, events))
+
+    logger.info(f"{len(events)} recurring events created by {user.username}")
+    return events
+
+
+def _send_summary_notification(user, events):
+    if not events or not user.email:
+        return
+
+    setup = get_setup()
+    lodges = {}
+    for event in events:
+        lodges.setdefault(event.lodge.name, []).append(event)
+
+    try:
+        send_email_notification(
+            subject='Eventos Recorrentes Criados com Sucesso',
+            template_name='email/events_bulk_created_notification.html',
+            context={
+                'user': user,
+                'title': events[0].title,
+                'total': len(events),
+                'lodges': sorted(lodges.items()),
+                'first_event': min(events, key=lambda event: event.start_time),
+                'last_event': max(events, key=lambda event: event.start_time),
+                'calendar_url': setup.calendar_url if setup else 'https://calendar.google.com/calendar'
+            },
+            recipient_list=[user.email]
+        )
+    except Exception as e:
+        logger.error(f"Error sending recurring events summary email: {e}")
@@ -1,3 +1,808 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from calendarrequest.models import OutgoingEmail
+from lodge.models import Lodge
+from events.admin import RecurringEventForm
+from events.conflicts import find_conflicts
+from events.ical import _fold
+from events.models import Event, CalendarSyncOperation, CalendarSyncState
+from events.googlecalendar import actions, outbox
+from events.googlecalendar.actions import GoogleCalendarService
+from events.googlecalendar.backends import get_calendar_service, reset_calendar_service
+from events.googlecalendar.offline import (
+    CassetteMismatch, InMemoryCalendarService, RecordingCalendarService, ReplayCalendarService
+)
+from events.googlecalendar.outbox import process_pending, MAX_ATTEMPTS
+from events.googlecalendar.sync import pull_changes
+from events.recurrence import expand_rule
+
+
+class FakeCalendarService:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+        self.batches = []
+
+    def create_event(self, event):
+        self.calls.append(('create', event.pk))
+        if self.fail:
+            raise Exception('Google indisponível')
+        return f'google-{event.pk}'
+
+    def update_event(self, event):
+        self.calls.append(('update', event.pk))
+
+    def delete_event(self, event):
+        self.calls.append(('delete', event.pk))
+        return True
+
+    def execute_batch(self, operations):
+        self.batches.append(len(operations))
+        results = []
+        for operation, event in operations:
+            try:
+                results.append((getattr(self, f'{operation}_event')(event), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+
+class CalendarOutboxTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='irmao', email='irmao@example.com')
+        self.lodge = Lodge.objects.create(name='Loja Teste', city='NITEROI', number='10')
+
+    def _create_event(self):
+        start = timezone.now() + timedelta(days=7)
+        return Event.objects.create(
+            user=self.user,
+            lodge=self.lodge,
+            title='Sessão',
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+            address='Rua A, 1'
+        )
+
+    def test_save_only_queues_operation(self):
+        event = self._create_event()
+
+        operation = CalendarSyncOperation.objects.get(event=event)
+        self.assertEqual(operation.operation, CalendarSyncOperation.CREATE)
+        self.assertEqual(operation.status, CalendarSyncOperation.PENDING)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_worker_syncs_and_notifies(self):
+        event = self._create_event()
+        service = FakeCalendarService()
+
+        process_pending(calendar_service=service)
+
+        event.refresh_from_db()
+        self.assertEqual(event.google_event_id, f'google-{event.pk}')
+        self.assertEqual(service.calls, [('create', event.pk)])
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+        event.is_cancelled = True
+        event.save()
+        event.save()
+        process_pending(calendar_service=service)
+
+        self.assertEqual(service.calls[-1], ('delete', event.pk))
+        self.assertEqual(
+            CalendarSyncOperation.objects.filter(event=event, operation=CalendarSyncOperation.DELETE).count(),
+            1
+        )
+
+    def test_failed_operation_is_retried_then_given_up(self):
+        event = self._create_event()
+        service = FakeCalendarService(fail=True)
+
+        for _ in range(MAX_ATTEMPTS):
+            process_pending(calendar_service=service)
+            CalendarSyncOperation.objects.update(next_attempt_at=timezone.now())
+
+        operation = CalendarSyncOperation.objects.get(event=event)
+        self.assertEqual(operation.status, CalendarSyncOperation.FAILED)
+        self.assertEqual(operation.attempts, MAX_ATTEMPTS)
+        self.assertEqual(len(service.calls), MAX_ATTEMPTS)
+
+    def test_operations_are_sent_in_one_batch(self):
+        events = [self._create_event() for _ in range(3)]
+        service = FakeCalendarService()
+
+        process_pending(calendar_service=service)
+
+        for event in events[:2]:
+            event.refresh_from_db()
+            event.is_cancelled = True
+            event.save()
+        process_pending(calendar_service=service)
+
+        self.assertEqual(service.batches, [3, 2])
+        self.assertFalse(Event.objects.filter(google_event_id__isnull=True).exists())
+        self.assertFalse(
+            CalendarSyncOperation.objects.exclude(status=CalendarSyncOperation.DONE).exists()
+        )
+
+    def test_service_construction_error_is_a_failed_attempt(self):
+        event = self._create_event()
+
+        with mock.patch(
+            'events.googlecalendar.outbox.get_calendar_service', side_effect=FileNotFoundError('token.json')
+        ):
+            results = process_pending()
+
+        operation = CalendarSyncOperation.objects.get(event=event)
+        self.assertEqual(results[CalendarSyncOperation.PENDING], 1)
+        self.assertEqual(operation.attempts, 1)
+        self.assertIn('token.json', operation.last_error)
+        self.assertGreater(operation.next_attempt_at, timezone.now())
+
+    def test_claim_survives_an_error_after_google_accepted_the_batch(self):
+        event = self._create_event()
+        service = FakeCalendarService()
+
+        with mock.patch('events.googlecalendar.outbox._save_results', side_effect=RuntimeError('db')):
+            with self.assertRaises(RuntimeError):
+                process_pending(calendar_service=service)
+        process_pending(calendar_service=service)
+
+        operation = CalendarSyncOperation.objects.get(event=event)
+        self.assertEqual(service.calls, [('create', event.pk)])
+        self.assertEqual(operation.status, CalendarSyncOperation.PENDING)
+        self.assertEqual(operation.attempts, 1)
+        self.assertGreater(operation.next_attempt_at, timezone.now())
+
+
+    def test_edit_while_sync_is_in_flight_is_sent_afterwards(self):
+        event = self._create_event()
+        service = FakeCalendarService()
+        save_results = outbox._save_results
+
+        def edit_then_save_results(*args):
+            Event.objects.get(pk=event.pk).save()  # admin edit between claim and results
+            return save_results(*args)
+
+        with mock.patch('events.googlecalendar.outbox._save_results', side_effect=edit_then_save_results):
+            process_pending(calendar_service=service, limit=1)
+        self.assertEqual(
+            list(CalendarSyncOperation.objects.filter(status=CalendarSyncOperation.PENDING).values_list(
+                'operation', flat=True
+            )),
+            [CalendarSyncOperation.UPDATE]
+        )
+
+        with mock.patch('events.googlecalendar.outbox._save_results', side_effect=edit_then_save_results):
+            process_pending(calendar_service=service, limit=1)
+        process_pending(calendar_service=service)
+
+        self.assertEqual(service.calls, [('create', event.pk), ('update', event.pk), ('update', event.pk)])
+        self.assertFalse(CalendarSyncOperation.objects.filter(status=CalendarSyncOperation.PENDING).exists())
+
+
+class CalendarServiceRegistryTests(SimpleTestCase):
+    def setUp(self):
+        token_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(token_dir.cleanup)
+        self.token_path = os.path.join(token_dir.name, 'token.json')
+        with open(self.token_path, 'w') as token:
+            token.write('{}')
+
+        self.registry = actions._ServiceRegistry()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.object(actions, 'TOKEN_PATH', self.token_path).start()
+        mock.patch.object(actions, '_registry', self.registry).start()
+        self.credentials = mock.patch.object(actions, 'Credentials').start()
+        self.credentials.from_authorized_user_file.return_value.valid = True
+        self.build = mock.patch.object(actions, 'build', side_effect=lambda *args, **kwargs: object()).start()
+
+    def test_client_is_built_once_per_thread(self):
+        service = self.registry.get_service()
+        self.assertIs(self.registry.get_service(), service)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.registry.get_service()))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(other[0], service)
+        self.assertEqual(self.build.call_count, 2)
+        self.assertEqual(self.credentials.from_authorized_user_file.call_count, 1)
+
+    def test_replaced_token_rebuilds_client(self):
+        service = self.registry.get_service()
+        stat = os.stat(self.token_path)
+        os.utime(self.token_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertIsNot(self.registry.get_service(), service)
+        self.assertEqual(self.build.call_count, 2)
+        self.assertEqual(self.credentials.from_authorized_user_file.call_count, 2)
+
+    def test_expired_credentials_are_refreshed_and_saved(self):
+        creds = self.credentials.from_authorized_user_file.return_value
+        creds.valid = False
+        creds.expired = True
+        creds.refresh_token = 'refresh'
+        creds.to_json.return_value = '{"token": "novo"}'
+
+        self.assertIs(self.registry.get_credentials(), creds)
+
+        creds.refresh.assert_called_once()
+        with open(self.token_path) as token:
+            self.assertEqual(token.read(), '{"token": "novo"}')
+
+
+class CalendarPullTests(TestCase):
+    """Incremental sync against recorded ``events().list`` responses."""
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='irmao', email='irmao@example.com')
+        lodge = Lodge.objects.create(name='Loja Teste', city='NITEROI', number='10')
+        start = timezone.now() + timedelta(days=7)
+        self.moved = Event.objects.create(
+            user=user, lodge=lodge, title='Sessão', start_time=start,
+            end_time=start + timedelta(hours=2), address='Rua A, 1', google_event_id='g-moved'
+        )
+        self.deleted = Event.objects.create(
+            user=user, lodge=lodge, title='Sessão', start_time=start,
+            end_time=start + timedelta(hours=2), address='Rua A, 1', google_event_id='g-deleted'
+        )
+        CalendarSyncOperation.objects.all().delete()
+
+    def _service(self, responses):
+        http = HttpMockSequence([({'status': status}, json.dumps(body)) for status, body in responses])
+        return GoogleCalendarService(service=build('calendar', 'v3', http=http, static_discovery=True))
+
+    def test_pull_follows_pages_and_stores_token(self):
+        service = self._service([
+            ('200', {
+                'items': [{
+                    'id': 'g-moved',
+                    'status': 'confirmed',
+                    'summary': 'LOJA LOJA TESTE - Sessão Magna',
+                    'location': 'Rua B, 2',
+                    'start': {'dateTime': '2030-01-10T19:00:00-03:00'},
+                    'end': {'dateTime': '2030-01-10T22:00:00-03:00'},
+                }],
+                'nextPageToken': 'page-2',
+            }),
+            ('200', {
+                'items': [
+                    {'id': 'g-deleted', 'status': 'cancelled'},
+                    {'id': 'g-unknown', 'status': 'confirmed', 'summary': 'Outro'},
+                ],
+                'nextSyncToken': 'sync-1',
+            }),
+            ('410', {'error': {'code': 410, 'message': 'Sync token is no longer valid'}}),
+            ('200', {'items': [], 'nextSyncToken': 'sync-2'}),
+        ])
+
+        stats = pull_changes(calendar_service=service)
+
+        self.assertEqual(stats, {'updated': 1, 'cancelled': 1, 'ignored': 1, 'skipped': 0})
+        self.moved.refresh_from_db()
+        self.assertEqual(self.moved.title, 'Sessão Magna')
+        self.assertEqual(self.moved.address, 'Rua B, 2')
+        self.assertEqual(self.moved.start_time.isoformat(), '2030-01-10T22:00:00+00:00')
+        self.assertTrue(Event.objects.get(pk=self.deleted.pk).is_cancelled)
+        self.assertFalse(CalendarSyncOperation.objects.exists())
+        self.assertEqual(CalendarSyncState.objects.get().sync_token, 'sync-1')
+
+        pull_changes(calendar_service=service)
+
+        self.assertEqual(CalendarSyncState.objects.get().sync_token, 'sync-2')
+
+    def test_pull_keeps_local_edits_waiting_in_the_outbox(self):
+        self.moved.title = 'Sessão Magna'
+        self.moved.save()
+        service = self._service([
+            ('200', {
+                'items': [{
+                    'id': 'g-moved',
+                    'status': 'confirmed',
+                    'summary': 'LOJA LOJA TESTE - Sessão',
+                    'location': 'Rua B, 2',
+                }],
+                'nextSyncToken': 'sync-1',
+            }),
+        ])
+
+        stats = pull_changes(calendar_service=service)
+
+        self.assertEqual(stats, {'updated': 0, 'cancelled': 0, 'ignored': 0, 'skipped': 1})
+        self.moved.refresh_from_db()
+        self.assertEqual((self.moved.title, self.moved.address), ('Sessão Magna', 'Rua A, 1'))
+
+
+class RecurringEventTests(TestCase):
+    def test_expand_second_and_fourth_tuesday(self):
+        dates = expand_rule('FREQ=MONTHLY;BYDAY=2TU,4TU', date(2026, 1, 1), date(2026, 3, 31))
+
+        self.assertEqual(dates, [
+            date(2026, 1, 13), date(2026, 1, 27),
+            date(2026, 2, 10), date(2026, 2, 24),
+            date(2026, 3, 10), date(2026, 3, 24),
+        ])
+
+    def test_monthly_without_byday_repeats_on_the_start_day(self):
+        self.assertEqual(
+            expand_rule('FREQ=MONTHLY', date(2026, 1, 13), date(2026, 3, 31)),
+            [date(2026, 1, 13), date(2026, 2, 13), date(2026, 3, 13)]
+        )
+        self.assertEqual(
+            expand_rule('FREQ=MONTHLY', date(2026, 1, 31), date(2026, 5, 31)),
+            [date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31)]
+        )
+
+    def test_admin_creates_all_occurrences_with_one_email(self):
+        admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        lodge = Lodge.objects.create(name='Loja 1', city='NITEROI', number='1')
+        self.client.force_login(admin_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/events/event/recurring/', {
+                'lodges': [lodge.pk],
+                'title': 'Sessão Ordinária',
+                'address': 'Rua A, 1',
+                'start_time': '19:30',
+                'end_time': '22:00',
+                'rule': 'FREQ=WEEKLY;INTERVAL=2;BYDAY=TH',
+                'start_date': '2026-01-01',
+                'end_date': '2026-12-31',
+            })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Event.objects.count(), 27)
+        self.assertEqual(
+            CalendarSyncOperation.objects.filter(operation=CalendarSyncOperation.CREATE, notify=False).count(),
+            27
+        )
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_lodges_sharing_an_address_conflict_with_each_other(self):
+        admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        lodges = [
+            Lodge.objects.create(name=f'Loja {number}', city='NITEROI', number=str(number))
+            for number in range(2)
+        ]
+        self.client.force_login(admin_user)
+
+        response = self.client.post('/admin/events/event/recurring/', {
+            'lodges': [lodge.pk for lodge in lodges],
+            'title': 'Sessão Ordinária',
+            'address': 'Templo Central',
+            'start_time': '19:30',
+            'end_time': '22:00',
+            'rule': 'FREQ=MONTHLY;BYDAY=2TU',
+            'start_date': '2026-01-01',
+            'end_date': '2026-03-31',
+        })
+
+        self.assertContains(response, 'Conflito de horário')
+        self.assertFalse(Event.objects.exists())
+
+
+class EventAdminQueryTests(TestCase):
+    url = '/admin/events/event/'
+
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        self.client.force_login(self.admin_user)
+        self.created = 0
+
+    def _create_events(self, count):
+        start = timezone.now() + timedelta(days=1)
+        events = []
+        for _ in range(count):
+            self.created += 1
+            lodge = Lodge.objects.create(name=f'Loja {self.created}', city='NITEROI', number=str(self.created))
+            events.append(Event(
+                user=self.admin_user,
+                lodge=lodge,
+                title=f'Sessão {self.created}',
+                start_time=start,
+                end_time=start + timedelta(hours=2),
+                address='Rua A, 1'
+            ))
+        Event.objects.bulk_create(events)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self._create_events(2)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(self.url)
+
+        self._create_events(30)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'LOJA 32')
+
+
+class EventIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = [CustomUser.objects.create_user(username=f'irmao{number}') for number in range(50)]
+        lodges = [
+            Lodge.objects.create(name=f'Loja {number}', city='NITEROI', number=str(number))
+            for number in range(50)
+        ]
+        start = timezone.now() - timedelta(days=1000)
+        Event.objects.bulk_create(
+            [
+                Event(
+                    user=users[number % 50],
+                    lodge=lodges[number % 50],
+                    title=f'Sessão {number}',
+                    start_time=start + timedelta(hours=number),
+                    end_time=start + timedelta(hours=number + 2),
+                    address='Rua A, 1',
+                    google_event_id=f'google-{number}',
+                    is_cancelled=number % 10 == 0
+                )
+                for number in range(10000)
+            ],
+            batch_size=1000
+        )
+        cls.user, cls.lodge = users[0], lodges[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_user_events_by_start_time(self):
+        self.assertUsesIndex(
+            Event.objects.filter(user=self.user, start_time__gte=timezone.now()).order_by('start_time'),
+            'events_user_start_idx'
+        )
+
+    def test_lodge_events_by_start_time(self):
+        self.assertUsesIndex(
+            Event.objects.filter(lodge=self.lodge, start_time__gte=timezone.now()).order_by('start_time'),
+            'events_lodge_start_idx'
+        )
+
+    def test_upcoming_active_events(self):
+        self.assertUsesIndex(
+            Event.objects.filter(is_cancelled=False, start_time__gte=timezone.now() - timedelta(days=5)),
+            'events_active_start_idx'
+        )
+
+    def test_conflict_lookup(self):
+        start = timezone.now()
+        index_name = 'events_span_gist_idx' if connection.vendor == 'postgresql' else 'events_lodge_end_idx'
+        self.assertUsesIndex(
+            find_conflicts(start, start + timedelta(hours=2), lodge=self.lodge, address='Rua A, 1'),
+            index_name
+        )
+
+    def test_google_event_id_lookup(self):
+        self.assertUsesIndex(
+            Event.objects.filter(google_event_id__in=['google-1', 'google-2']),
+            'events_google_id_idx'
+        )
+
+
+class EventFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = CustomUser.objects.create_user(username='irmao')
+        self.niteroi = Lodge.objects.create(name='Loja Niterói', city='NITEROI', number='1')
+        self.macae = Lodge.objects.create(name='Loja Macaé', city='MACAE', number='2')
+        start = timezone.now() + timedelta(days=2)
+        self.event, cancelled, past, other_city = Event.objects.bulk_create([
+            Event(user=user, lodge=self.niteroi, title='Sessão, Magna; Aberta', start_time=start,
+                  end_time=start + timedelta(hours=2), address='Rua A, 1'),
+            Event(user=user, lodge=self.niteroi, title='Cancelada', start_time=start,
+                  end_time=start + timedelta(hours=2), address='Rua A, 1', is_cancelled=True),
+            Event(user=user, lodge=self.niteroi, title='Passada', start_time=start - timedelta(days=10),
+                  end_time=start - timedelta(days=10), address='Rua A, 1'),
+            Event(user=user, lodge=self.macae, title='Sessão Macaé', start_time=start,
+                  end_time=start + timedelta(hours=2), address='Rua B, 2'),
+        ])
+
+    def test_json_feed_lists_upcoming_active_events(self):
+        response = self.client.get('/events/', {'city': 'NITEROI'})
+
+        titles = [event['title'] for event in response.json()['events']]
+        self.assertEqual(titles, ['Sessão, Magna; Aberta'])
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_ics_feed_filters_by_lodge(self):
+        response = self.client.get('/events/feed.ics', {'lodge': self.macae.pk})
+
+        content = response.content.decode()
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn('SUMMARY:LOJA MACAÉ - Sessão Macaé', content)
+        self.assertNotIn('Magna', content)
+
+    def test_conditional_request_returns_304_without_queries(self):
+        response = self.client.get('/events/feed.ics')
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get('/events/feed.ics', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        not_modified = self.client.get('/events/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_etag_changes_when_an_event_changes(self):
+        etag = self.client.get('/events/')['ETag']
+
+        self.event.title = 'Sessão Alterada'
+        self.event.save()
+        cache.clear()
+
+        response = self.client.get('/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalid_filter_is_rejected(self):
+        self.assertEqual(self.client.get('/events/', {'lodge': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get('/events/', {'city': 'GOTHAM'}).status_code, 400)
+
+
+class ICalendarTests(TestCase):
+    def test_long_lines_are_folded_without_splitting_characters(self):
+        folded = _fold('DESCRIPTION:' + 'ç' * 100)
+
+        for line in folded.split('\r\n'):
+            self.assertLessEqual(len(line.encode('utf-8')), 75)
+        self.assertEqual(folded.replace('\r\n ', ''), 'DESCRIPTION:' + 'ç' * 100)
+
+
+class EventExportTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha', first_name='Fulano'
+        )
+        self.client.force_login(self.admin_user)
+        lodge = Lodge.objects.create(name='Loja Export', city='NITEROI', number='7')
+        start = timezone.now()
+        Event.objects.bulk_create([
+            Event(user=self.admin_user, lodge=lodge, title=f'Sessão {number}', start_time=start,
+                  end_time=start + timedelta(hours=2), address='Rua A, 1')
+            for number in range(25)
+        ] + [
+            Event(user=self.admin_user, title='Reunião "Especial"', start_time=start,
+                  end_time=start + timedelta(hours=2), address='Rua B, 2')
+        ])
+
+    def test_csv_export_streams_every_event(self):
+        response = self.client.get('/admin/events/event/export/csv/')
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(rows[0][0], 'Título')
+        self.assertEqual(len(rows), 27)
+        self.assertIn(['LOJA EXPORT', '7', 'Niterói'], [row[1:4] for row in rows])
+        self.assertIn('Reunião "Especial"', [row[0] for row in rows])
+
+    def test_ics_export_respects_changelist_search(self):
+        response = self.client.get('/admin/events/event/export/ics/', {'q': 'Especial'})
+
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+
+    def test_unknown_format_is_not_found(self):
+        self.assertEqual(self.client.get('/admin/events/event/export/pdf/').status_code, 404)
+
+    def test_export_skips_changelist_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/events/event/export/csv/')
+            b''.join(response.streaming_content)
+
+        event_queries = [query['sql'] for query in queries.captured_queries if 'events_event' in query['sql']]
+        self.assertEqual(len(event_queries), 1)
+        self.assertNotIn('COUNT(', event_queries[0])
+
+    def test_invalid_filter_redirects_to_changelist(self):
+        response = self.client.get('/admin/events/event/export/csv/', {'start_time__gte': 'ontem'})
+
+        self.assertRedirects(response, '/admin/events/event/?e=1', fetch_redirect_response=False)
+
+
+class EventConflictTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='senha'
+        )
+        self.lodge_a = Lodge.objects.create(name='Loja A', city='NITEROI', number='1')
+        self.lodge_b = Lodge.objects.create(name='Loja B', city='NITEROI', number='2')
+        self.start = timezone.make_aware(datetime(2026, 1, 15, 19, 30))
+        self.existing, _cancelled = Event.objects.bulk_create([
+            Event(user=self.admin_user, lodge=self.lodge_a, title='Sessão A', start_time=self.start,
+                  end_time=self.start + timedelta(hours=2), address='Rua A, 1'),
+            Event(user=self.admin_user, lodge=self.lodge_b, title='Cancelada', start_time=self.start,
+                  end_time=self.start + timedelta(hours=2), address='Rua B, 2', is_cancelled=True),
+        ])
+
+    def test_conflicts_at_same_lodge_or_address(self):
+        start, end = self.start + timedelta(hours=1), self.start + timedelta(hours=3)
+
+        self.assertEqual(list(find_conflicts(start, end, lodge=self.lodge_a, address='Rua C, 3')), [self.existing])
+        self.assertEqual(list(find_conflicts(start, end, lodge=self.lodge_b, address='Rua A, 1')), [self.existing])
+        self.assertFalse(find_conflicts(start, end, lodge=self.lodge_b, address='Rua B, 2').exists())
+        self.assertFalse(find_conflicts(
+            self.start + timedelta(hours=2), end, lodge=self.lodge_a, address='Rua A, 1'
+        ).exists())
+        self.assertFalse(find_conflicts(
+            start, end, lodge=self.lodge_a, address='Rua A, 1', exclude_pk=self.existing.pk
+        ).exists())
+
+    def test_admin_form_reports_conflict(self):
+        self.client.force_login(self.admin_user)
+
+        response = self.client.post('/admin/events/event/add/', {
+            'user': self.admin_user.pk,
+            'lodge': self.lodge_b.pk,
+            'title': 'Sessão B',
+            'start_time_0': '2026-01-15',
+            'start_time_1': '20:00',
+            'end_time_0': '2026-01-15',
+            'end_time_1': '23:00',
+            'address': 'Rua A, 1',
+        })
+
+        self.assertContains(response, 'Conflito de horário')
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_recurring_form_reports_conflicts_with_one_query(self):
+        self.client.force_login(self.admin_user)
+        data = {
+            'lodges': [self.lodge_a.pk, self.lodge_b.pk],
+            'title': 'Sessão Ordinária',
+            'address': 'Rua C, 3',
+            'start_time': '20:00',
+            'end_time': '22:00',
+            'rule': 'FREQ=WEEKLY;BYDAY=TH',
+            'start_date': '2026-01-01',
+            'end_date': '2026-12-31',
+        }
+        form = RecurringEventForm(data, lodges=Lodge.objects.all())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(form.is_valid())
+        self.assertIn('Sessão A', str(form.non_field_errors()))
+        self.assertEqual(
+            len([query for query in queries.captured_queries if 'events_event' in query['sql']]), 1
+        )
+
+        response = self.client.post('/admin/events/event/recurring/', data)
+        self.assertContains(response, 'Conflito de horário')
+        self.assertEqual(Event.objects.count(), 2)
+
+
+@override_settings(CALENDAR_BACKEND='memory', CALENDAR_FAKE_LATENCY_MS=0, CALENDAR_FAKE_FAILURE_RATE=0)
+class CalendarBackendTests(TestCase):
+    def setUp(self):
+        reset_calendar_service()
+        self.addCleanup(reset_calendar_service)
+        self.user = CustomUser.objects.create_user(username='irmao', email='irmao@example.com')
+        self.lodge = Lodge.objects.create(name='Loja Teste', city='NITEROI', number='10')
+
+    def _create_event(self):
+        start = timezone.now() + timedelta(days=7)
+        return Event.objects.create(
+            user=self.user,
+            lodge=self.lodge,
+            title='Sessão',
+            start_time=start,
+            end_time=start + timedelta(hours=2),
+            address='Rua A, 1'
+        )
+
+    def test_setting_selects_shared_in_memory_backend(self):
+        service = get_calendar_service()
+
+        self.assertIsInstance(service, InMemoryCalendarService)
+        self.assertIs(get_calendar_service(), service)
+
+    def test_signal_path_round_trips_through_memory_backend(self):
+        event = self._create_event()
+        process_pending()
+        event.refresh_from_db()
+        calendar = get_calendar_service()
+
+        self.assertEqual(calendar.events[event.google_event_id]['summary'], f'LOJA {self.lodge.name} - Sessão')
+        self.assertEqual(pull_changes()['updated'], 0)
+
+        event.is_cancelled = True
+        event.save()
+        process_pending()
+
+        self.assertEqual(calendar.events[event.google_event_id]['status'], 'cancelled')
+        self.assertEqual(pull_changes(), {'updated': 0, 'cancelled': 0, 'ignored': 0, 'skipped': 0})
+
+    def test_injected_failures_are_retried_by_the_outbox(self):
+        with override_settings(CALENDAR_FAKE_FAILURE_RATE=1):
+            reset_calendar_service()
+            event = self._create_event()
+            process_pending()
+
+        operation = CalendarSyncOperation.objects.get(event=event)
+        self.assertEqual(operation.status, CalendarSyncOperation.PENDING)
+        self.assertIn('Injected failure', operation.last_error)
+
+    def test_replay_answers_recorded_calls(self):
+        event = self._create_event()
+        memory = InMemoryCalendarService()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cassette.jsonl')
+            recorder = RecordingCalendarService(lambda: memory, path)
+            recorded = recorder.execute_batch([('create', event)])
+            recorder.list_changes()
+
+            replay = ReplayCalendarService(path)
+            self.assertEqual(replay.execute_batch([('create', event)]), recorded)
+            self.assertEqual(replay.list_changes()[0][0]['id'], recorded[0][0])
+            with self.assertRaises(CassetteMismatch):
+                replay.execute_batch([('delete', event)])
+
+    def test_benchmark_command_runs_offline(self):
+        out = io.StringIO()
+        call_command('benchmark_event_sync', events=5, stdout=out)
+
+        self.assertIn('5 events created, updated and cancelled in sync', out.getvalue())
+        self.assertFalse(Event.objects.filter(title__startswith='Sessão ').exists())
+
+
+class ImportTimeTests(SimpleTestCase):
+    # Sum of the "self" column of -X importtime for django.setup(); about
+    # 0.6s on a laptop, so the budget only trips on a heavy new import.
+    BUDGET_SECONDS = 1.5
+    GOOGLE_MODULES = ('googleapiclient', 'google_auth_oauthlib', 'google.oauth2', 'google.auth')
+
+    def test_setup_stays_within_budget_without_google_client(self):
+        result = subprocess.run(
+            [
+                sys.executable, '-X', 'importtime', '-c',
+                'import django; django.setup(); '
+                'import events.googlecalendar.outbox, events.googlecalendar.sync',
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ['DJANGO_SETTINGS_MODULE']},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        total_us = 0
+        modules = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _cumulative, module = line[len('import time:'):].split('|')
+            total_us += int(self_us)
+            modules.add(module.strip())
+
+        loaded = sorted(module for module in modules if module.startswith(self.GOOGLE_MODULES))
+        self.assertEqual(loaded, [])
+        self.assertLess(total_us / 1e6, self.BUDGET_SECONDS)
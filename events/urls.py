@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import event_list
+from .views import event_list, event_list_ics
+
+app_name = 'events'
 
 urlpatterns = [
     path('', event_list, name='event_list'),
+    path('feed.ics', event_list_ics, name='event_list_ics'),
 ]
-
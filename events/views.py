@@ -0,0 +1,153 @@
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from core.utils.choices import CITY
+from .ical import build_calendar
+from .models import Event
+
+DEFAULT_DAYS = 180
+MAX_DAYS = 366
+
+_CITIES = dict(CITY)
+
+
+def _feed_state(request):
+    """
+    Resolve the feed filters and the validators for this request.
+
+    Validators (latest ``updated_at`` of the events and lodges in the window,
+    plus the number of active events) are cached for
+    ``EVENT_FEED_CACHE_TIMEOUT`` seconds per filter, so conditional requests
+    from polling clients usually do not touch the database at all.
+
+    Returns:
+        dict: filters, window and validators, or None if the query string is invalid
+    """
+    if not hasattr(request, '_event_feed_state'):
+        request._event_feed_state = _build_feed_state(request)
+    return request._event_feed_state
+
+
+def _build_feed_state(request):
+    lodge = request.GET.get('lodge') or None
+    city = request.GET.get('city') or None
+    try:
+        days = min(int(request.GET.get('days', DEFAULT_DAYS)), MAX_DAYS)
+        if lodge is not None:
+            lodge = int(lodge)
+    except ValueError:
+        return None
+    if days < 1 or (city is not None and city not in _CITIES):
+        return None
+
+    # The window starts at local midnight so the feed only changes when an
+    # event, its lodge or the date changes.
+    today = timezone.localdate()
+    window_start = timezone.make_aware(datetime.combine(today, time.min))
+    window_end = window_start + timedelta(days=days)
+
+    filters = Q(start_time__gte=window_start, start_time__lt=window_end)
+    if lodge is not None:
+        filters &= Q(lodge_id=lodge)
+    if city is not None:
+        filters &= Q(lodge__city=city)
+
+    cache_key = f'events:feed:{today.isoformat()}:{days}:{lodge}:{city}'
+    validators = cache.get(cache_key)
+    if validators is None:
+        validators = Event.objects.filter(filters).aggregate(
+            event_updated_at=Max('updated_at'),
+            lodge_updated_at=Max('lodge__updated_at'),
+            total=Count('pk', filter=Q(is_cancelled=False)),
+        )
+        cache.set(cache_key, validators, settings.EVENT_FEED_CACHE_TIMEOUT)
+
+    last_modified = max(
+        value for value in (validators['event_updated_at'], validators['lodge_updated_at'], window_start)
+        if value is not None
+    )
+    etag = hashlib.md5(f'{cache_key}:{last_modified.isoformat()}:{validators["total"]}'.encode()).hexdigest()
+
+    return {'filters': filters, 'city': city, 'last_modified': last_modified, 'etag': etag}
+
+
+def _feed_etag(request, *args, **kwargs):
+    state = _feed_state(request)
+    return state and state['etag']
+
+
+def _feed_last_modified(request, *args, **kwargs):
+    state = _feed_state(request)
+    return state and state['last_modified']
+
+
+def _feed_events(state):
+    return (
+        Event.objects
+        .filter(state['filters'], is_cancelled=False)
+        .select_related('lodge')
+        .order_by('start_time', 'pk')
+    )
+
+
+feed_view = condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+
+
+@require_GET
+@cache_control(public=True, max_age=settings.EVENT_FEED_MAX_AGE)
+@feed_view
+def event_list(request):
+    """
+    Public JSON feed of upcoming, non-cancelled events.
+
+    Query parameters: ``lodge`` (id), ``city`` (code from ``CITY``) and
+    ``days`` (window length, default 180).
+    """
+    state = _feed_state(request)
+    if state is None:
+        return HttpResponseBadRequest('Parâmetros inválidos.')
+
+    events = [
+        {
+            'id': str(event.uuid),
+            'title': event.title,
+            'description': event.description,
+            'address': event.address,
+            'start_time': event.start_time.isoformat(),
+            'end_time': event.end_time.isoformat(),
+            'lodge': {
+                'id': event.lodge.pk,
+                'name': event.lodge.name,
+                'number': event.lodge.number,
+                'city': event.lodge.city,
+            } if event.lodge else None,
+        }
+        for event in _feed_events(state)
+    ]
+    return JsonResponse({'events': events}, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+@cache_control(public=True, max_age=settings.EVENT_FEED_MAX_AGE)
+@feed_view
+def event_list_ics(request):
+    """
+    Public iCalendar feed with the same events and filters as ``event_list``.
+    """
+    state = _feed_state(request)
+    if state is None:
+        return HttpResponseBadRequest('Parâmetros inválidos.')
+
+    name = f'Eventos - {_CITIES[state["city"]]}' if state['city'] else 'Eventos'
+    calendar = build_calendar(_feed_events(state), name, request.get_host())
+    response = HttpResponse(calendar, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="eventos.ics"'
+    return response
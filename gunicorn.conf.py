@@ -0,0 +1,87 @@
+"""
+Gunicorn configuration, loaded automatically from the project root.
+
+Every value can be overridden through the environment:
+
+    GUNICORN_BIND             Address to bind (default 0.0.0.0:8000)
+    GUNICORN_WORKER_CLASS     gthread (default), gevent, sync or uvicorn (ASGI)
+    GUNICORN_WORKERS          Worker processes (default 2 * CPUs + 1, at most 12)
+    GUNICORN_THREADS          Threads per gthread worker (default 4)
+    GUNICORN_CONNECTIONS      Concurrent connections per gevent worker (default 200)
+    GUNICORN_MAX_REQUESTS     Requests before a worker is recycled (default 1000)
+    GUNICORN_TIMEOUT          Seconds before a silent worker is killed (default 30)
+
+The application (core.wsgi or, for uvicorn workers, core.asgi) is chosen
+here, so it must not be given on the command line.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+"""
+
+import importlib.util
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+    # Keep the site up if the image was built without gevent.
+    print('⚠️  gevent is not installed, falling back to gthread workers')
+    worker_class = 'gthread'
+if worker_class == 'uvicorn' and importlib.util.find_spec('uvicorn_worker') is None:
+    print('⚠️  uvicorn-worker is not installed, falling back to gthread workers')
+    worker_class = 'gthread'
+
+if worker_class == 'uvicorn':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    wsgi_app = 'core.asgi:application'
+    # Under ASGI the ORM runs in per-request executor threads, so persistent
+    # connections would pile up; pool with pgbouncer instead. sample.env sets
+    # DB_CONN_MAX_AGE for the WSGI workers, so it has to be overridden here.
+    if os.environ.get('DB_CONN_MAX_AGE', '0') != '0':
+        print('⚠️  DB_CONN_MAX_AGE is ignored with uvicorn workers, using 0')
+    os.environ['DB_CONN_MAX_AGE'] = '0'
+else:
+    wsgi_app = 'core.wsgi:application'
+
+workers = _env_int('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 12))
+# gthread: requests waiting on SMTP or Google keep a thread busy, not the worker.
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = _env_int('GUNICORN_CONNECTIONS', 200)
+
+# Recycle workers periodically (with jitter so they do not all restart at
+# once) to bound memory growth.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max(max_requests // 10, 1) if max_requests else 0
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = 30
+keepalive = 5
+
+# Import Django once in the master so workers fork with the app loaded.
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections must never be shared between processes; drop anything
+    # opened while the app was preloaded in the master.
+    from django.db import connections
+
+    connections.close_all()
+
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning('psycogreen is not installed: database calls will block gevent workers')
+        else:
+            patch_psycopg()
@@ -7,5 +7,5 @@ from .models import Lodge
 class LodgeAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'number',)
     list_filter = ('city',)
-    search_fields = ('name', 'user__username', 'city', 'number',)
+    search_fields = ('name', 'userlodge__user__username', 'city', 'number',)
     readonly_fields = ('created_at', 'updated_at',)
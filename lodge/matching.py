@@ -0,0 +1,161 @@
+"""
+In-process trigram index over lodge names.
+
+Applicants type the lodge name and number by hand, so an exact lookup on
+the number misses typos, missing numbers and names written differently.
+The index scores every lodge with the same similarity as PostgreSQL's
+``pg_trgm`` (shared trigrams over all trigrams), works on every database
+backend and answers from memory: a few thousand lodges take milliseconds.
+
+The index is built on first use and rebuilt when a lodge is saved or
+deleted in this process, or after ``LODGE_INDEX_TIMEOUT`` seconds so other
+workers pick up changes made elsewhere.
+"""
+
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+
+from .models import Lodge
+from .utils import lodge_key, normalize_lodge_number
+
+# Words every lodge name carries; they would make all names look alike.
+STOPWORDS = frozenset({
+    'A', 'R', 'L', 'S', 'ARLS', 'ARL', 'LOJA', 'AUGUSTA', 'RESPEITAVEL',
+    'MACONICA', 'SIMBOLICA', 'DE', 'DA', 'DO', 'DAS', 'DOS', 'E',
+})
+# pg_trgm's default similarity threshold
+MIN_SCORE = 0.3
+# Minimum score for the approval to suggest a lodge by name to the reviewer
+AUTO_MATCH_SCORE = 0.6
+
+LodgeMatch = namedtuple('LodgeMatch', ['lodge_id', 'name', 'number', 'score', 'by_number'])
+
+
+def trigrams(name):
+    """
+    Trigrams of a lodge name, computed like ``pg_trgm``.
+
+    Each word of the normalized name is padded with two leading spaces and
+    one trailing space; lodge stopwords are skipped.
+
+    Args:
+        name (str): Lodge name as typed
+
+    Returns:
+        set: Three-character strings
+    """
+    grams = set()
+    for word in lodge_key(name).split():
+        if word in STOPWORDS:
+            continue
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LodgeIndex:
+    """Inverted trigram index over a snapshot of the lodges."""
+
+    def __init__(self, lodges):
+        """
+        Args:
+            lodges (iterable): (pk, name, number) tuples
+        """
+        self.lodges = {}
+        self.by_number = {}
+        self.postings = defaultdict(list)
+        self.sizes = {}
+        for pk, name, number in lodges:
+            self.lodges[pk] = (name, number)
+            if number:
+                self.by_number[number] = pk
+            grams = trigrams(name)
+            self.sizes[pk] = len(grams)
+            for gram in grams:
+                self.postings[gram].append(pk)
+
+    def _match(self, pk, score, by_number=False):
+        name, number = self.lodges[pk]
+        return LodgeMatch(pk, name, number, score, by_number)
+
+    def search(self, name, number=None, limit=5, min_score=MIN_SCORE):
+        """
+        Rank the lodges most similar to a free-text name.
+
+        A lodge whose number matches ``number`` comes first with score 1.
+
+        Args:
+            name (str): Lodge name as typed
+            number (str): Lodge number as typed, if any
+            limit (int): Maximum number of matches
+            min_score (float): Lowest similarity returned, from 0 to 1
+
+        Returns:
+            list: LodgeMatch tuples, best first
+        """
+        matches = []
+        number_pk = self.by_number.get(normalize_lodge_number(number))
+        if number_pk is not None:
+            matches.append(self._match(number_pk, 1.0, by_number=True))
+
+        grams = trigrams(name)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for pk, count in shared.items():
+            if pk == number_pk:
+                continue
+            score = count / (len(grams) + self.sizes[pk] - count)
+            if score >= min_score:
+                scored.append((score, pk))
+        scored.sort(key=lambda item: (-item[0], self.lodges[item[1]][0]))
+
+        matches.extend(self._match(pk, score) for score, pk in scored[:limit - len(matches)])
+        return matches[:limit]
+
+    def best_match(self, name, number=None):
+        """
+        Return the lodge a request most likely refers to, or None.
+
+        Exact number matches win. Otherwise the best name match is only
+        returned when it scores at least ``AUTO_MATCH_SCORE`` and is
+        strictly better than the runner-up.
+
+        Returns:
+            LodgeMatch: The match, or None when no lodge is a clear suggestion
+        """
+        matches = self.search(name, number, limit=2, min_score=AUTO_MATCH_SCORE)
+        if not matches:
+            return None
+        if matches[0].by_number or len(matches) == 1 or matches[0].score > matches[1].score:
+            return matches[0]
+        return None
+
+
+_lock = threading.Lock()
+_index = None
+_built_at = 0.0
+
+
+def get_lodge_index():
+    """Return the lodge index of this process, rebuilding it when stale."""
+    global _index, _built_at
+
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > settings.LODGE_INDEX_TIMEOUT:
+            _index = LodgeIndex(Lodge.objects.values_list('pk', 'name', 'number').iterator())
+            _built_at = time.monotonic()
+        return _index
+
+
+def reset_lodge_index():
+    """Drop the index so the next lookup rebuilds it."""
+    global _index
+
+    with _lock:
+        _index = None
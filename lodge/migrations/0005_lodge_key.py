@@ -0,0 +1,121 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:45
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from lodge.utils import lodge_key, normalize_lodge_number
+
+
+def dedupe_lodges(apps, schema_editor):
+    """
+    Fill ``key`` and normalize ``number``, merging lodges that are the same.
+
+    Lodges sharing a number are merged, and so are lodges sharing a key
+    unless that would join two different numbers. Lodges with the same
+    name but different numbers are kept apart: every one but the first
+    gets its number appended to the name, so the keys stay unique.
+
+    The lowest pk of each group survives: events and memberships of the
+    other lodges are moved to it (dropping memberships it already has)
+    before they are deleted. Every merge and rename is printed.
+    """
+    Lodge = apps.get_model('lodge', 'Lodge')
+    Event = apps.get_model('events', 'Event')
+    UserLodge = apps.get_model('accounts', 'UserLodge')
+
+    lodges = list(Lodge.objects.order_by('pk'))
+    parent = {lodge.pk: lodge.pk for lodge in lodges}
+    group_number = {}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    def union(a, b):
+        a, b = sorted((find(a), find(b)))
+        if a == b:
+            return True
+        if group_number.get(a) and group_number.get(b) and group_number[a] != group_number[b]:
+            return False
+        parent[b] = a
+        group_number[a] = group_number.get(a) or group_number.get(b)
+        return True
+
+    first_by_number = {}
+    for lodge in lodges:
+        lodge.key = lodge_key(lodge.name)
+        lodge.number = normalize_lodge_number(lodge.number)
+        group_number[lodge.pk] = lodge.number
+        if lodge.number is None:
+            continue
+        if lodge.number in first_by_number:
+            union(first_by_number[lodge.number], lodge.pk)
+        else:
+            first_by_number[lodge.number] = lodge.pk
+
+    by_key = defaultdict(list)
+    for lodge in lodges:
+        if not any(union(other, lodge.pk) for other in by_key[lodge.key]):
+            by_key[lodge.key].append(lodge.pk)
+
+    groups = defaultdict(list)
+    for lodge in lodges:
+        groups[find(lodge.pk)].append(lodge)
+
+    for survivor, *duplicates in groups.values():
+        if duplicates:
+            duplicate_ids = [lodge.pk for lodge in duplicates]
+            survivor.number = group_number[survivor.pk]
+            for lodge in duplicates:
+                print(
+                    f'  Lodge {lodge.pk} "{lodge.name}" (number {lodge.number or "-"}) merged into '
+                    f'lodge {survivor.pk} "{survivor.name}" (number {survivor.number or "-"})'
+                )
+
+            Event.objects.filter(lodge_id__in=duplicate_ids).update(lodge_id=survivor.pk)
+            members = set(UserLodge.objects.filter(lodge_id=survivor.pk).values_list('user_id', flat=True))
+            for membership in UserLodge.objects.filter(lodge_id__in=duplicate_ids).order_by('pk'):
+                if membership.user_id in members:
+                    membership.delete()
+                else:
+                    members.add(membership.user_id)
+                    membership.lodge_id = survivor.pk
+                    membership.save(update_fields=['lodge'])
+            Lodge.objects.filter(pk__in=duplicate_ids).delete()
+
+    keys = {}
+    for survivor in (group[0] for group in groups.values()):
+        if survivor.key in keys:
+            # Same name as an earlier lodge, but another number.
+            name = f'{survivor.name} Nº {survivor.number}'
+            if lodge_key(name) in keys:
+                name = f'{name} ({survivor.pk})'
+            print(
+                f'  Lodge {survivor.pk} "{survivor.name}" (number {survivor.number}) has the name of '
+                f'lodge {keys[survivor.key]} with another number, not merged; renamed to "{name}"'
+            )
+            survivor.name = name
+            survivor.key = lodge_key(name)
+        keys[survivor.key] = survivor.pk
+        Lodge.objects.filter(pk=survivor.pk).update(name=survivor.name, key=survivor.key, number=survivor.number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lodge', '0004_lodge_number_alter_lodge_city'),
+        ('events', '0010_event_overlap_indexes'),
+        ('accounts', '0006_customuser_profession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lodge',
+            name='key',
+            field=models.CharField(editable=False, max_length=255, null=True, verbose_name='Chave'),
+        ),
+        migrations.RunPython(dedupe_lodges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0005: PostgreSQL refuses ALTER TABLE in the transaction
+    # that deleted the duplicate lodges while FK checks are still pending.
+
+    dependencies = [
+        ('lodge', '0005_lodge_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lodge',
+            name='key',
+            field=models.CharField(editable=False, help_text='Nome normalizado (sem acentos, pontuação e "Nº"), usado nas buscas', max_length=255, unique=True, verbose_name='Chave'),
+        ),
+        migrations.AlterField(
+            model_name='lodge',
+            name='number',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True, verbose_name='Número'),
+        ),
+    ]
@@ -1,14 +1,36 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from core.behaviours.trackable import Trackable
 from core.utils.choices import CITY
 
+from .utils import lodge_key, normalize_lodge_number
+
+
+class LodgeQuerySet(models.QuerySet):
+    def by_number(self, number):
+        """Lodges whose number matches ``number`` once normalized."""
+        return self.filter(number=normalize_lodge_number(number))
+
+    def by_name(self, name):
+        """Lodges whose normalized name matches ``name``."""
+        return self.filter(key=lodge_key(name))
+
 
 class Lodge(Trackable):
     name = models.CharField(
         max_length=255,
         verbose_name='Nome da loja'
     )
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        editable=False,
+        verbose_name='Chave',
+        help_text='Nome normalizado (sem acentos, pontuação e "Nº"), usado nas buscas'
+    )
     city = models.CharField(
         max_length=255,
         verbose_name='Cidade',
@@ -18,11 +40,23 @@ class Lodge(Trackable):
         max_length=20,
         verbose_name='Número',
         blank=True,
-        null=True
+        null=True,
+        unique=True
     )
 
+    objects = LodgeQuerySet.as_manager()
+
+    def clean(self):
+        # key is not a form field, so validate_unique() never checks it.
+        self.number = normalize_lodge_number(self.number)
+        self.key = lodge_key(self.name)
+        if Lodge.objects.filter(key=self.key).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': 'Já existe uma loja com este nome.'})
+
     def save(self, *args, **kwargs):
         self.name = self.name.upper()
+        self.key = lodge_key(self.name)
+        self.number = normalize_lodge_number(self.number)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -32,3 +66,10 @@ class Lodge(Trackable):
         verbose_name = 'Loja'
         verbose_name_plural = 'Lojas'
 
+
+@receiver(post_save, sender=Lodge)
+@receiver(post_delete, sender=Lodge)
+def invalidate_lodge_index(sender, **kwargs):
+    from .matching import reset_lodge_index
+
+    reset_lodge_index()
@@ -1,3 +1,189 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from calendarrequest.models import StoreRequest
+from setup.models import Setup
+from .matching import LodgeIndex, get_lodge_index, reset_lodge_index, trigrams
+from .models import Lodge
+from .utils import lodge_key, normalize_lodge_number
+
+
+class LodgeKeyTests(TestCase):
+    def test_key_ignores_case_accents_punctuation_and_number_marker(self):
+        self.assertEqual(lodge_key('Loja São João, Nº 012'), 'LOJA SAO JOAO 12')
+        self.assertEqual(lodge_key('LOJA SAO JOAO N° 12'), 'LOJA SAO JOAO 12')
+        self.assertEqual(lodge_key('Loja Nova Era'), 'LOJA NOVA ERA')
+
+    def test_number_is_normalized(self):
+        self.assertEqual(normalize_lodge_number(' Nº 0012 '), '12')
+        self.assertEqual(normalize_lodge_number('12-a'), '12A')
+        self.assertIsNone(normalize_lodge_number(''))
+
+    def test_lookups_use_normalized_values(self):
+        lodge = Lodge.objects.create(name='Loja Acácia', city='NITEROI', number='007')
+
+        self.assertEqual(lodge.number, '7')
+        self.assertEqual(Lodge.objects.by_number('nº 7').get(), lodge)
+        self.assertEqual(Lodge.objects.by_name('loja acacia').get(), lodge)
+
+    def test_admin_rejects_duplicate_name(self):
+        Lodge.objects.create(name='Loja Acácia', city='NITEROI', number='7')
+        admin_user = CustomUser.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        self.client.force_login(admin_user)
+
+        response = self.client.post('/admin/lodge/lodge/add/', {
+            'name': 'LOJA ACACIA',
+            'city': 'NITEROI',
+            'number': '8',
+        })
+
+        self.assertContains(response, 'Já existe uma loja com este nome.')
+        self.assertEqual(Lodge.objects.count(), 1)
+
+    def test_store_request_approval_reuses_lodge_with_same_key(self):
+        Setup.objects.create(url='http://localhost:8000', admin_email='admin@example.com')
+        lodge = Lodge.objects.create(name='Loja Acácia Nº 7', city='NITEROI')
+        user = CustomUser.objects.create_user(username='irmao', email='irmao@example.com')
+        store_request = StoreRequest.objects.create(user=user, name='loja acacia 7', city='NITEROI', number='7')
+
+        store_request.approved = True
+        with self.captureOnCommitCallbacks(execute=True):
+            store_request.save()
+
+        self.assertEqual(Lodge.objects.get(), lodge)
+
+
+class LodgeDedupeMigrationTests(TransactionTestCase):
+    def _migrate(self, lodge_migration=None):
+        # Every other app stays at its latest migration.
+        executor = MigrationExecutor(connection)
+        targets = [
+            ('lodge', lodge_migration) if lodge_migration and app == 'lodge' else (app, name)
+            for app, name in executor.loader.graph.leaf_nodes()
+        ]
+        executor.migrate(targets)
+        executor.loader.build_graph()
+        return executor.loader.project_state(targets).apps
+
+    def test_duplicates_are_merged_into_the_oldest_lodge(self):
+        apps = self._migrate('0004_lodge_number_alter_lodge_city')
+        Lodge = apps.get_model('lodge', 'Lodge')
+        Event = apps.get_model('events', 'Event')
+        CustomUser = apps.get_model('accounts', 'CustomUser')
+        UserLodge = apps.get_model('accounts', 'UserLodge')
+
+        kept = Lodge.objects.create(name='LOJA ACÁCIA', city='NITEROI', number='7')
+        same_name = Lodge.objects.create(name='Loja Acacia.', city='NITEROI')
+        same_number = Lodge.objects.create(name='ACACIA', city='NITEROI', number='007')
+        other = Lodge.objects.create(name='LOJA NOVA ERA', city='NITEROI', number='8')
+        user = CustomUser.objects.create(username='irmao')
+        UserLodge.objects.create(user=user, lodge=kept)
+        UserLodge.objects.create(user=user, lodge=same_name)
+        start = timezone.now()
+        event = Event.objects.create(
+            user=user, lodge=same_number, title='Sessão', start_time=start, end_time=start + timedelta(hours=2)
+        )
+
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            apps = self._migrate()
+        Lodge = apps.get_model('lodge', 'Lodge')
+
+        self.assertIn(f'Lodge {same_number.pk} "ACACIA" (number 7) merged into lodge {kept.pk}', stdout.getvalue())
+        self.assertEqual(
+            sorted(Lodge.objects.values_list('pk', 'key', 'number')),
+            [(kept.pk, 'LOJA ACACIA', '7'), (other.pk, 'LOJA NOVA ERA', '8')]
+        )
+        self.assertFalse(Lodge.objects.filter(pk__in=[same_name.pk, same_number.pk]).exists())
+        self.assertEqual(apps.get_model('events', 'Event').objects.get(pk=event.pk).lodge_id, kept.pk)
+        self.assertEqual(
+            list(apps.get_model('accounts', 'UserLodge').objects.values_list('lodge_id', flat=True)),
+            [kept.pk]
+        )
+
+
+    def test_same_name_with_another_number_is_reported_not_merged(self):
+        apps = self._migrate('0004_lodge_number_alter_lodge_city')
+        Lodge = apps.get_model('lodge', 'Lodge')
+        first = Lodge.objects.create(name='LOJA FRATERNIDADE', city='NITEROI', number='12')
+        unnumbered = Lodge.objects.create(name='Loja Fraternidade', city='NITEROI')
+        other = Lodge.objects.create(name='LOJA FRATERNIDADE', city='NITEROI', number='13')
+
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            apps = self._migrate()
+        Lodge = apps.get_model('lodge', 'Lodge')
+
+        self.assertEqual(
+            sorted(Lodge.objects.values_list('pk', 'name', 'key', 'number')),
+            [
+                (first.pk, 'LOJA FRATERNIDADE', 'LOJA FRATERNIDADE', '12'),
+                (other.pk, 'LOJA FRATERNIDADE Nº 13', 'LOJA FRATERNIDADE 13', '13'),
+            ]
+        )
+        output = stdout.getvalue()
+        self.assertIn(f'Lodge {unnumbered.pk} "Loja Fraternidade" (number -) merged into lodge {first.pk}', output)
+        self.assertIn(f'Lodge {other.pk} "LOJA FRATERNIDADE" (number 13) has the name of lodge {first.pk}', output)
+
+
+class LodgeMatchingTests(TestCase):
+    def setUp(self):
+        reset_lodge_index()
+        self.fraternidade = Lodge.objects.create(name='Loja Fraternidade Nº 12', city='NITEROI', number='12')
+        self.uniao = Lodge.objects.create(name='ARLS União e Trabalho', city='NITEROI', number='30')
+        self.acacia = Lodge.objects.create(name='Loja Acácia Fluminense', city='NITEROI', number='45')
+
+    def test_similarity_matches_pg_trgm(self):
+        self.assertEqual(trigrams('Loja Cat'), {'  c'.upper(), ' CA', 'CAT', 'AT '})
+        # SELECT similarity('word', 'two words') returns 0.36363637 (4 shared of 11 trigrams).
+        index = LodgeIndex([(1, 'two words', None), (2, 'word', None)])
+        self.assertAlmostEqual(index.search('word', min_score=0)[1].score, 0.36363637, places=6)
+        self.assertEqual(index.search('word', min_score=0)[0].score, 1.0)
+
+    def test_typos_and_missing_words_still_match(self):
+        matches = get_lodge_index().search('loja fraternidadi')
+
+        self.assertEqual(matches[0].lodge_id, self.fraternidade.pk)
+        self.assertGreater(matches[0].score, 0.5)
+        self.assertEqual(get_lodge_index().search('Uniao Trabalho')[0].lodge_id, self.uniao.pk)
+
+    def test_number_match_comes_first(self):
+        matches = get_lodge_index().search('Fraternidade', number='Nº 45')
+
+        self.assertEqual([match.lodge_id for match in matches[:2]], [self.acacia.pk, self.fraternidade.pk])
+        self.assertTrue(matches[0].by_number)
+
+    def test_best_match_refuses_weak_or_tied_candidates(self):
+        Lodge.objects.create(name='Loja Fraternidade Nº 13', city='NITEROI', number='13')
+
+        self.assertIsNone(get_lodge_index().best_match('Acacia Paulista do Norte'))
+        self.assertIsNone(get_lodge_index().best_match('Fraternidade'))
+        self.assertEqual(get_lodge_index().best_match('Acácia Fluminense').lodge_id, self.acacia.pk)
+
+    def test_index_is_rebuilt_after_lodge_changes(self):
+        get_lodge_index()
+        lodge = Lodge.objects.create(name='Loja Estrela do Oriente', city='NITEROI', number='77')
+
+        self.assertEqual(get_lodge_index().search('estrela oriente')[0].lodge_id, lodge.pk)
+
+    def test_search_only_reads_postings_of_the_query(self):
+        Lodge.objects.bulk_create([
+            Lodge(name=f'LOJA TESTE {number} LUZ', key=f'LOJA TESTE {number} LUZ', city='NITEROI', number=f'T{number}')
+            for number in range(3000)
+        ])
+        reset_lodge_index()
+        index = get_lodge_index()
+
+        # The work depends on the lodges sharing a trigram with the query,
+        # not on the size of the index.
+        candidates = {pk for gram in trigrams('Loja Fraternidadi') for pk in index.postings.get(gram, ())}
+        self.assertLessEqual(candidates, {self.fraternidade.pk, self.uniao.pk, self.acacia.pk})
+        self.assertEqual(len(index.lodges), 3003)
+        self.assertEqual(
+            [match.lodge_id for match in index.search('Loja Fraternidadi', '999')], [self.fraternidade.pk]
+        )
@@ -0,0 +1,49 @@
+import re
+import unicodedata
+
+# "Nº", "N°", "Nro", "No." and "#" in front of a lodge number
+_NUMBER_MARKER_RE = re.compile(r'(?:\bN(?:[º°O]|RO)?\.?|#)\s*(?=\d)')
+_NOT_ALNUM_RE = re.compile(r'[^A-Z0-9]+')
+_LEADING_ZEROS_RE = re.compile(r'\b0+(?=\d)')
+
+
+def _strip_accents(value):
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def lodge_key(name):
+    """
+    Normalize a lodge name for lookups and the unique ``Lodge.key``.
+
+    Uppercases, strips accents, punctuation, the "Nº" marker and leading
+    zeros, and collapses whitespace, so "Loja Fraternidade, Nº 012" and
+    "LOJA FRATERNIDADE 12" share a key.
+
+    Args:
+        name (str): Lodge name as typed
+
+    Returns:
+        str: Normalized key
+    """
+    # "º" decomposes to "o", so find the marker before stripping accents.
+    value = _NUMBER_MARKER_RE.sub(' ', (name or '').upper())
+    value = _NOT_ALNUM_RE.sub(' ', _strip_accents(value).upper()).strip()
+    return _LEADING_ZEROS_RE.sub('', value)
+
+
+def normalize_lodge_number(number):
+    """
+    Normalize a lodge number: no "Nº" marker, spaces, punctuation or leading zeros.
+
+    Args:
+        number (str): Lodge number as typed
+
+    Returns:
+        str: Normalized number, or None when nothing is left
+    """
+    value = _NUMBER_MARKER_RE.sub('', (number or '').strip().upper())
+    value = _NOT_ALNUM_RE.sub('', _strip_accents(value).upper())
+    if value.isdigit():
+        value = value.lstrip('0') or '0'
+    return value or None
@@ -0,0 +1,197 @@
+"""
+Django management command to benchmark every admin page against a seeded dataset.
+
+Seeds lodges, brothers, events and requests inside a transaction, then
+measures query count and wall time for every registered changelist, a
+search on it and a change form. Everything is rolled back at the end.
+
+Usage:
+    python manage.py benchmark_admin [--lodges 500] [--brothers 20000] [--events 100000]
+                                     [--max-queries 25] [--max-ms 1500]
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser, UserLodge
+from calendarrequest.models import StoreRequest, CancelEventRequest, UserRequest
+from core.utils.choices import CITY
+from events.models import Event
+from lodge.models import Lodge
+from lodge.utils import lodge_key
+from setup.models import Profession
+
+BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure query count and latency of every admin page on a seeded dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lodges', type=int, default=500, help='Number of lodges to seed')
+        parser.add_argument('--brothers', type=int, default=20000, help='Number of brothers to seed')
+        parser.add_argument('--events', type=int, default=100000, help='Number of events to seed')
+        parser.add_argument('--max-queries', type=int, default=25, help='Query budget per page')
+        parser.add_argument('--max-ms', type=float, default=1500, help='Wall time budget per page (ms)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("⏱️  ADMIN BENCHMARK")
+        self.stdout.write("="*50)
+
+        results = []
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                admin_user = self._seed(options)
+                self.stdout.write(f"🌱 Dataset seeded in {time.perf_counter() - started:.1f}s")
+
+                results = self._run(admin_user)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        over_budget = []
+        self.stdout.write(f"\n{'page':<70} {'queries':>8} {'ms':>9}")
+        for name, status, queries, elapsed_ms in results:
+            failed = status != 200 or queries > options['max_queries'] or elapsed_ms > options['max_ms']
+            line = f"{name:<70} {queries:>8} {elapsed_ms:>9.1f}"
+            if failed:
+                over_budget.append(name)
+                line += f"  ❌ HTTP {status}" if status != 200 else "  ❌ over budget"
+            self.stdout.write(line)
+
+        if over_budget:
+            raise CommandError(f"{len(over_budget)} page(s) failed or went over budget")
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {len(results)} pages within budget"))
+
+    def _seed(self, options):
+        rng = random.Random(42)
+        cities = [code for code, _ in CITY]
+        now = timezone.now()
+
+        professions = Profession.objects.bulk_create(
+            [Profession(name=f'PROFISSÃO BENCH {number}') for number in range(30)]
+        )
+        lodges = Lodge.objects.bulk_create(
+            [
+                # bulk_create skips Lodge.save(), which fills the unique key
+                Lodge(
+                    name=f'LOJA BENCH {number}',
+                    key=lodge_key(f'LOJA BENCH {number}'),
+                    city=rng.choice(cities),
+                    number=f'B{number}'
+                )
+                for number in range(options['lodges'])
+            ],
+            batch_size=BATCH_SIZE
+        )
+        brothers = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f'bench{number}',
+                    email=f'bench{number}@example.com',
+                    first_name=f'Irmão {number}',
+                    last_name='Bench',
+                    password='!',
+                    is_staff=True,
+                    profession=rng.choice(professions)
+                )
+                for number in range(options['brothers'])
+            ],
+            batch_size=BATCH_SIZE
+        )
+        UserLodge.objects.bulk_create(
+            [UserLodge(user=brother, lodge=rng.choice(lodges)) for brother in brothers],
+            batch_size=BATCH_SIZE
+        )
+
+        events = []
+        for number in range(options['events']):
+            start = now + timedelta(hours=rng.randint(-24 * 365, 24 * 365))
+            events.append(Event(
+                user=rng.choice(brothers),
+                lodge=rng.choice(lodges),
+                title=f'Sessão {number}',
+                start_time=start,
+                end_time=start + timedelta(hours=3),
+                address=f'Rua {number % 1000}',
+                is_cancelled=rng.random() < 0.05
+            ))
+        events = Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+
+        StoreRequest.objects.bulk_create(
+            [
+                StoreRequest(user=rng.choice(brothers), name=f'LOJA PEDIDO {number}', city=rng.choice(cities))
+                for number in range(max(1, options['lodges'] // 5))
+            ],
+            batch_size=BATCH_SIZE
+        )
+        CancelEventRequest.objects.bulk_create(
+            [
+                CancelEventRequest(user=rng.choice(brothers), event=rng.choice(events), reason='Bench')
+                for _ in range(max(1, options['events'] // 100))
+            ],
+            batch_size=BATCH_SIZE
+        )
+        UserRequest.objects.bulk_create(
+            [
+                UserRequest(
+                    name=f'Candidato {number}',
+                    surname='Bench',
+                    email=f'candidato{number}@example.com',
+                    phone='21999999999',
+                    profession=rng.choice(professions),
+                    lodge_name=rng.choice(lodges).name,
+                    lodge_number=str(number)
+                )
+                for number in range(max(1, options['brothers'] // 10))
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        return CustomUser.objects.create_superuser(
+            username='bench-admin', email='bench-admin@example.com', password=None
+        )
+
+    def _run(self, admin_user):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        client.force_login(admin_user)
+        request = RequestFactory().get('/')
+        request.user = admin_user
+        results = []
+
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            changelist_url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            pages = [(f'{opts.label} changelist', changelist_url)]
+            if model_admin.search_fields:
+                pages.append((f'{opts.label} search', f'{changelist_url}?q=bench'))
+            obj = model_admin.get_queryset(request).order_by('pk').last()
+            if obj is not None:
+                pages.append((
+                    f'{opts.label} change form',
+                    reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[obj.pk])
+                ))
+
+            for name, url in pages:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                results.append((name, response.status_code, len(queries.captured_queries), elapsed_ms))
+
+        return results
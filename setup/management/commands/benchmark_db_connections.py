@@ -0,0 +1,83 @@
+"""
+Django management command to compare per-request latency with and without
+persistent database connections.
+
+Each request goes through Django's WSGI handler, so the request_started /
+request_finished signals open and close connections exactly as they do
+under gunicorn.
+
+Usage:
+    python manage.py benchmark_db_connections [--requests 200] [--path /calendar/user-request/]
+"""
+
+import statistics
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Measure request latency with CONN_MAX_AGE=0 versus the configured connection reuse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode')
+        parser.add_argument('--path', default='/calendar/user-request/', help='Path requested')
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔌 DATABASE CONNECTION BENCHMARK")
+        self.stdout.write("="*50)
+
+        db_settings = connection.settings_dict
+        configured = (db_settings['CONN_MAX_AGE'], db_settings['CONN_HEALTH_CHECKS'])
+        self.stdout.write(f"🛢️  {db_settings['ENGINE']} at {db_settings['HOST'] or 'localhost'}:{db_settings['PORT'] or '-'}")
+        self.stdout.write(f"🌐 GET {options['path']} x {options['requests']}\n")
+
+        modes = [
+            ('new connection per request', 0, False),
+            (f"CONN_MAX_AGE={configured[0]}, health checks={configured[1]}", *configured),
+        ]
+        handler = WSGIHandler()
+        try:
+            for label, max_age, health_checks in modes:
+                connection.close()
+                db_settings['CONN_MAX_AGE'] = max_age
+                db_settings['CONN_HEALTH_CHECKS'] = health_checks
+                timings = self._run(handler, options['path'], options['requests'])
+                self._report(label, timings)
+        finally:
+            connection.close()
+            db_settings['CONN_MAX_AGE'], db_settings['CONN_HEALTH_CHECKS'] = configured
+
+    def _run(self, handler, path, count):
+        timings = []
+        for _ in range(count):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': settings.ALLOWED_HOSTS[0],
+                'SERVER_PORT': '443',
+                'HTTP_HOST': settings.ALLOWED_HOSTS[0],
+                'wsgi.url_scheme': 'https',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': self.stderr,
+            }
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            # Closing the response fires request_finished, which is where
+            # Django closes connections that are past CONN_MAX_AGE.
+            response.close()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, label, timings):
+        timings = sorted(timings)
+        self.stdout.write(f"📊 {label}")
+        self.stdout.write(f"   mean: {statistics.mean(timings):.2f}ms")
+        self.stdout.write(f"   p50:  {timings[len(timings) // 2]:.2f}ms")
+        self.stdout.write(f"   p95:  {timings[int(len(timings) * 0.95) - 1]:.2f}ms")
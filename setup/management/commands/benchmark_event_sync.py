@@ -0,0 +1,153 @@
+"""
+Django management command to benchmark the event -> calendar sync path offline.
+
+Creates, updates and cancels events through the ORM so ``event_post_save``
+queues the outbox rows, drains the outbox after each phase into the
+in-memory calendar backend, then pulls the changes back and checks nothing
+drifted. Everything is rolled back at the end; Google is never called.
+
+Usage:
+    python manage.py benchmark_event_sync [--events 1000] [--latency-ms 150]
+                                          [--failure-rate 0.01] [--limit 500]
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from events.googlecalendar.offline import InMemoryCalendarService
+from events.googlecalendar.outbox import MAX_ATTEMPTS, process_pending
+from events.googlecalendar.sync import pull_changes
+from events.models import Event, CalendarSyncOperation
+from lodge.models import Lodge
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Drive event create/update/cancel cycles through the signals and outbox into a fake calendar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Number of events per phase')
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=settings.CALENDAR_FAKE_LATENCY_MS,
+            help='Latency added to every calendar API request'
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=settings.CALENDAR_FAKE_FAILURE_RATE,
+            help='Share of calendar writes that fail and are retried'
+        )
+        parser.add_argument('--limit', type=int, default=500, help='Operations per outbox run')
+
+    def handle(self, *args, **options):
+        self.stdout.write("⏱️  EVENT SYNC BENCHMARK")
+        self.stdout.write("="*50)
+
+        calendar = InMemoryCalendarService(
+            latency=options['latency_ms'] / 1000,
+            failure_rate=options['failure_rate'],
+            seed=0
+        )
+        self.limit = options['limit']
+
+        try:
+            with transaction.atomic():
+                self._run(calendar, options['events'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, calendar, count):
+        user = CustomUser.objects.create_user(username='benchmark-sync', email='benchmark-sync@example.com')
+        lodge = Lodge.objects.create(name='Loja Benchmark', city='NITEROI', number='99999')
+        start = timezone.now() + timedelta(days=30)
+
+        def create():
+            return [
+                Event.objects.create(
+                    user=user,
+                    lodge=lodge,
+                    title=f'Sessão {number}',
+                    start_time=start + timedelta(hours=3 * number),
+                    end_time=start + timedelta(hours=3 * number + 2),
+                    address='Rua A, 1'
+                ).pk
+                for number in range(count)
+            ]
+
+        def update():
+            for event in Event.objects.select_related('lodge').filter(pk__in=pks):
+                event.title = f'{event.title} (alterada)'
+                event.save()
+
+        def cancel():
+            for event in Event.objects.select_related('lodge').filter(pk__in=pks):
+                event.is_cancelled = True
+                event.save()
+
+        self.stdout.write(f"\n{'phase':<8} {'save ms/event':>14} {'drain s':>9} {'ops/s':>9} {'requests':>9} {'failed':>7}")
+        pks = self._phase('create', create, calendar, count)
+        self._phase('update', update, calendar, count)
+        self._phase('cancel', cancel, calendar, count)
+
+        started = time.perf_counter()
+        stats = pull_changes(calendar_service=calendar)
+        self.stdout.write(
+            f"\n🔄 Pull: {stats['updated']} updated, {stats['cancelled']} cancelled, "
+            f"{stats['ignored']} ignored, {stats['skipped']} skipped in {time.perf_counter() - started:.2f}s"
+        )
+
+        # Only a delete that ran out of attempts may leave an event live.
+        live = sum(1 for item in calendar.events.values() if item['status'] != 'cancelled')
+        failed_deletes = CalendarSyncOperation.objects.filter(
+            event__user=user,
+            operation=CalendarSyncOperation.DELETE,
+            status=CalendarSyncOperation.FAILED
+        ).count()
+        if stats['updated'] or live > failed_deletes:
+            raise CommandError(
+                f"Calendar drifted: {stats['updated']} event(s) changed on pull, {live} still live"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} events created, updated and cancelled in sync"))
+
+    def _phase(self, label, save, calendar, count):
+        started = time.perf_counter()
+        result = save()
+        save_ms = (time.perf_counter() - started) * 1000 / max(count, 1)
+
+        requests_before = calendar.requests
+        operations = CalendarSyncOperation.objects.filter(status=CalendarSyncOperation.PENDING).count()
+        started = time.perf_counter()
+        failed = self._drain(calendar)
+        drain = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label:<8} {save_ms:>14.2f} {drain:>9.2f} {operations / drain if drain else 0:>9.0f} "
+            f"{calendar.requests - requests_before:>9} {failed:>7}"
+        )
+        return result
+
+    def _drain(self, calendar):
+        # Retries are normally spaced out by minutes; run them straight away,
+        # as many times as the outbox allows attempts.
+        failed = CalendarSyncOperation.objects.filter(status=CalendarSyncOperation.FAILED)
+        failed_before = failed.count()
+        for _ in range(MAX_ATTEMPTS):
+            while any(process_pending(calendar_service=calendar, limit=self.limit).values()):
+                pass
+            pending = CalendarSyncOperation.objects.filter(status=CalendarSyncOperation.PENDING)
+            if not pending.exists():
+                break
+            pending.update(next_attempt_at=timezone.now())
+        return failed.count() - failed_before
@@ -0,0 +1,73 @@
+"""
+Django management command to compare serial and parallel account provisioning.
+
+For each batch size, creates that many users through
+``accounts.provisioning.create_users`` once with in-process hashing and once
+with the process pool, and reports accounts per second. Everything is
+rolled back at the end.
+
+Usage:
+    python manage.py benchmark_provisioning [--sizes 10,100,1000] [--workers N]
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from accounts.models import CustomUser
+from accounts.provisioning import create_users
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare serial and parallel password hashing when provisioning accounts in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated batch sizes')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.PROVISIONING_WORKERS or os.cpu_count(),
+            help='Hashing processes for the parallel run'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("⏱️  PROVISIONING BENCHMARK")
+        self.stdout.write("="*50)
+        self.stdout.write(
+            f"🖥️  {os.cpu_count()} CPU(s), {options['workers']} worker(s), "
+            f"threshold in settings: {settings.PROVISIONING_PARALLEL_THRESHOLD}"
+        )
+
+        self.stdout.write(f"\n{'accounts':>8} {'serial s':>9} {'acc/s':>7} {'parallel s':>11} {'acc/s':>7} {'speedup':>8}")
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            serial = self._time(size, workers=1)
+            parallel = self._time(size, workers=options['workers'], threshold=0)
+            self.stdout.write(
+                f"{size:>8} {serial:>9.2f} {size / serial:>7.1f} "
+                f"{parallel:>11.2f} {size / parallel:>7.1f} {serial / parallel:>7.2f}x"
+            )
+
+    def _time(self, size, workers, threshold=None):
+        users = [
+            CustomUser(username=f'benchmark-{number}@example.com', email=f'benchmark-{number}@example.com')
+            for number in range(size)
+        ]
+        passwords = [get_random_string(12) for _ in users]
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                create_users(users, passwords, workers=workers, threshold=threshold)
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        return elapsed
@@ -0,0 +1,37 @@
+"""
+Django management command to show how long each email template takes to render.
+
+Usage:
+    python manage.py email_render_stats
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max
+
+from calendarrequest.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Show render time statistics per email template'
+
+    def handle(self, *args, **options):
+        self.stdout.write("📊 EMAIL TEMPLATE RENDER TIMES")
+        self.stdout.write("="*50)
+
+        stats = (
+            OutgoingEmail.objects
+            .exclude(render_time_ms__isnull=True)
+            .values('template_name')
+            .annotate(count=Count('id'), avg_ms=Avg('render_time_ms'), max_ms=Max('render_time_ms'))
+            .order_by('-avg_ms')
+        )
+
+        if not stats:
+            self.stdout.write("⚠️  No rendered emails found.")
+            return
+
+        for row in stats:
+            self.stdout.write(
+                f"  - {row['template_name']}: {row['count']} emails, "
+                f"avg {row['avg_ms']:.2f}ms, max {row['max_ms']:.2f}ms"
+            )
@@ -0,0 +1,123 @@
+"""
+Django management command to load test the site over HTTP.
+
+Without --url it starts gunicorn (with gunicorn.conf.py) once per value of
+--workers and reports how throughput scales; with --url it only measures
+an already running server.
+
+Usage:
+    python manage.py load_test [--workers 1,2,4] [--concurrency 16] [--duration 10]
+                               [--path /calendar/user-request/] [--url http://host:8000]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PORT = 8765
+
+
+class Command(BaseCommand):
+    help = 'Measure throughput and latency of the site, optionally across gunicorn worker counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,2,4', help='Comma-separated gunicorn worker counts')
+        parser.add_argument('--worker-class', default=None, help='Override GUNICORN_WORKER_CLASS')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per run')
+        parser.add_argument('--path', default='/calendar/user-request/', help='Path requested')
+        parser.add_argument('--url', default=None, help='Base URL of a running server; skips starting gunicorn')
+
+    def handle(self, *args, **options):
+        self.stdout.write("🚀 LOAD TEST")
+        self.stdout.write("="*50)
+
+        if options['url']:
+            results = self._load(options['url'].rstrip('/') + options['path'], options)
+            self._report(options['url'], results)
+            return
+
+        for workers in [int(value) for value in options['workers'].split(',')]:
+            server = self._start_gunicorn(workers, options['worker_class'])
+            try:
+                results = self._load(f"http://127.0.0.1:{PORT}{options['path']}", options)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            self._report(f"{workers} worker(s)", results)
+
+    def _start_gunicorn(self, workers, worker_class):
+        env = {**os.environ, 'GUNICORN_WORKERS': str(workers), 'GUNICORN_BIND': f'127.0.0.1:{PORT}'}
+        if worker_class:
+            env['GUNICORN_WORKER_CLASS'] = worker_class
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--access-logfile', '/dev/null'],
+            cwd=Path(settings.BASE_DIR),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('gunicorn exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', PORT), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError('gunicorn did not start within 30 seconds')
+
+    def _load(self, url, options):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+        host = settings.ALLOWED_HOSTS[0]
+
+        def client():
+            while time.monotonic() < deadline:
+                request = urllib.request.Request(url, headers={'Host': host, 'X-Forwarded-Proto': 'https'})
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                except (urllib.error.URLError, OSError) as e:
+                    with lock:
+                        errors.append(e)
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, options['duration']
+
+    def _report(self, label, results):
+        latencies, errors, duration = results
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"❌ {label}: no successful requests ({len(errors)} errors)"))
+            return
+        latencies.sort()
+        self.stdout.write(
+            f"📊 {label}: {len(latencies) / duration:.1f} req/s, "
+            f"p50 {statistics.median(latencies):.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms, "
+            f"{len(errors)} errors"
+        )
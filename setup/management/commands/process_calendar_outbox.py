@@ -0,0 +1,48 @@
+"""
+Django management command to push pending Event changes to Google Calendar.
+
+Usage:
+    python manage.py process_calendar_outbox [--limit N] [--loop] [--interval SECONDS]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.googlecalendar.outbox import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Process the Google Calendar sync outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Maximum number of operations processed per run'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting after one run'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between runs when --loop is set'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            results = process_pending(limit=options['limit'])
+            if any(results.values()):
+                self.stdout.write(
+                    f"📅 Outbox: {results['done']} done, "
+                    f"{results['pending']} retrying, {results['failed']} failed"
+                )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,48 @@
+"""
+Django management command to deliver queued notification emails.
+
+Usage:
+    python manage.py send_queued_emails [--limit N] [--loop] [--interval SECONDS]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from calendarrequest.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Send pending emails from the outbox over a single SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=200,
+            help='Maximum number of emails sent per run'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting after one run'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between runs when --loop is set'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            results = send_queued_emails(limit=options['limit'])
+            if any(results.values()):
+                self.stdout.write(
+                    f"📧 Emails: {results['sent']} sent, "
+                    f"{results['pending']} retrying, {results['failed']} failed"
+                )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
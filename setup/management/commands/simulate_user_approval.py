@@ -71,7 +71,7 @@ class Command(BaseCommand):
         
         # Check if lodge exists
         try:
-            lodge = Lodge.objects.get(number=user_request.lodge_number)
+            lodge = Lodge.objects.by_number(user_request.lodge_number).get()
             self.stdout.write(f"✅ Lodge found: {lodge.name}")
         except Lodge.DoesNotExist:
             self.stdout.write(
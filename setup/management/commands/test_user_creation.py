@@ -79,7 +79,7 @@ class Command(BaseCommand):
             
             # Try to find and associate the lodge
             try:
-                lodge = Lodge.objects.get(number=sample_request.lodge_number)
+                lodge = Lodge.objects.by_number(sample_request.lodge_number).get()
                 self.stdout.write(f"✅ Lodge found: {lodge.name}")
                 
                 # Create UserLodge association
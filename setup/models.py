@@ -1,4 +1,11 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+SETUP_CACHE_KEY = 'setup:current'
+_MISSING = object()
 
 
 class Setup(models.Model):
@@ -26,6 +33,31 @@ class Setup(models.Model):
         verbose_name_plural = 'Configurações'
 
 
+def get_setup():
+    """
+    Return the current Setup (the last one created), cached in Django's cache.
+
+    Replaces ``Setup.objects.last()`` on hot paths. The entry is dropped when
+    a Setup is saved or deleted in this process and expires after
+    ``SETUP_CACHE_TIMEOUT`` seconds, which bounds how long other workers can
+    see a stale value when the cache backend is not shared.
+
+    Returns:
+        Setup: The current configuration, or None if there is none
+    """
+    setup = cache.get(SETUP_CACHE_KEY, _MISSING)
+    if setup is _MISSING:
+        setup = Setup.objects.last()
+        cache.set(SETUP_CACHE_KEY, setup, settings.SETUP_CACHE_TIMEOUT)
+    return setup
+
+
+@receiver(post_save, sender=Setup)
+@receiver(post_delete, sender=Setup)
+def invalidate_setup_cache(sender, **kwargs):
+    cache.delete(SETUP_CACHE_KEY)
+
+
 class Profession(models.Model):
     name = models.CharField(
         max_length=255,
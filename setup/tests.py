@@ -1,3 +1,44 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from lodge.models import Lodge
+from .models import Setup, get_setup
+
+
+class GetSetupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_setup_is_cached_until_saved(self):
+        setup = Setup.objects.create(
+            url='http://localhost:8000',
+            calendar_url='https://calendar.google.com/calendar',
+            admin_email='admin@example.com'
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_setup(), setup)
+            self.assertEqual(get_setup(), setup)
+
+        setup.admin_email = 'novo@example.com'
+        setup.save()
+
+        self.assertEqual(get_setup().admin_email, 'novo@example.com')
+
+    def test_missing_setup_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_setup())
+            self.assertIsNone(get_setup())
+
+
+class BenchmarkAdminCommandTests(TestCase):
+    def test_every_admin_page_renders_within_budget(self):
+        out = StringIO()
+        call_command('benchmark_admin', lodges=3, brothers=10, events=20, max_queries=30, max_ms=10000, stdout=out)
+
+        self.assertIn('events.Event changelist', out.getvalue())
+        self.assertIn('pages within budget', out.getvalue())
+        self.assertFalse(Lodge.objects.exists())